@@ -0,0 +1,70 @@
+"""EJ metrics: raster zonal means, block demographics, tract proximity."""
+from contextlib import ExitStack
+
+import numpy as np
+import pandas as pd
+import pytest
+import rasterio
+
+import synthetic
+from landfill_sdss.criteria import (EJ_METRICS, demographic_score, ej_table, proximity_score,
+                                    raster_mean)
+from landfill_sdss.ej_reference import LEVELS
+
+BLOCKS = 16_000   # ~NY census block groups
+TRACTS = 5_000    # ~NY census tracts
+
+
+@pytest.fixture(scope='module')
+def rasters(tmp_path_factory):
+    d = tmp_path_factory.mktemp('ej')
+    return {name: synthetic.write_raster(d / f"{name}.tif", seed=i)
+            for i, name in enumerate(('air', 'diesel'))}
+
+
+@pytest.fixture(scope='module')
+def blocks():
+    return synthetic.block_grid(BLOCKS)
+
+
+@pytest.fixture(scope='module')
+def tract_centroids():
+    return synthetic.block_grid(TRACTS, seed=4).geometry.centroid
+
+
+def bench_ej_zonal_stats(measure, n_sites, rasters):
+    geoms = synthetic.site_buffers(n_sites).geometry
+
+    def run():
+        with ExitStack() as stack:
+            srcs = {k: stack.enter_context(rasterio.open(p)) for k, p in rasters.items()}
+            return [{k: raster_mean(s, g) for k, s in srcs.items()} for g in geoms]
+
+    assert len(measure(run)) == n_sites
+
+
+def bench_ej_demographics(measure, n_sites, blocks):
+    geoms = synthetic.site_buffers(n_sites).geometry
+    assert len(measure(lambda: [demographic_score(blocks, g) for g in geoms])) == n_sites
+
+
+def bench_proximity(measure, n_sites, tract_centroids):
+    geoms = synthetic.site_buffers(n_sites).geometry
+    assert len(measure(lambda: [proximity_score(tract_centroids, g) for g in geoms])) == n_sites
+
+
+def bench_ej_normalize(measure, n_sites):
+    rows = [{'Site': r['Site'], 'air': r['Tipping_Fee'], 'diesel': r['EJ_Rating'],
+             'demo': r['Hydrological_Risk'], 'prox': r['Dist_to_rail_mi']}
+            for r in synthetic.site_rows(n_sites)]
+    assert len(measure(ej_table, rows)) == n_sites
+
+
+def bench_ej_percentile(measure, n_sites):
+    rows = [{'Site': r['Site'], 'air': r['Tipping_Fee'], 'diesel': r['EJ_Rating'],
+             'demo': r['Hydrological_Risk'], 'prox': r['Dist_to_rail_mi']}
+            for r in synthetic.site_rows(n_sites)]
+    statewide = pd.DataFrame(rows[::2])  # stand-in reference distribution
+    q = np.linspace(0, 1, LEVELS)
+    reference = pd.DataFrame({m: np.quantile(statewide[m], q) for m in EJ_METRICS})
+    assert len(measure(ej_table, rows, reference=reference)) == n_sites
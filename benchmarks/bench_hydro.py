@@ -0,0 +1,37 @@
+"""Hydro-risk overlay: buffer ∩ statewide hazard layers per site."""
+import pytest
+import rasterio
+
+import synthetic
+from landfill_sdss.batch import criterion_table
+from landfill_sdss.criteria import hydro_fractions, hydro_risk
+
+HAZARD_POLYGONS = 20_000   # per layer, ~statewide wetlands density
+
+
+@pytest.fixture(scope='module')
+def hazards():
+    return {f"layer_{i}": synthetic.hazard_layer(HAZARD_POLYGONS, seed=i) for i in range(4)}
+
+
+@pytest.fixture(scope='module')
+def depth_raster(tmp_path_factory):
+    return synthetic.write_raster(tmp_path_factory.mktemp('hydro') / 'depth.tif')
+
+
+def bench_hydro_overlay(measure, n_sites, hazards, depth_raster):
+    buffers = synthetic.site_buffers(n_sites)
+
+    def run():
+        with rasterio.open(depth_raster) as src:
+            return [hydro_risk(hydro_fractions(buffers.geometry.iloc[[i]], hazards, src))
+                    for i in range(len(buffers))]
+
+    assert len(measure(run)) == n_sites
+
+
+def bench_hydro_pipeline(measure, n_sites, hazards, depth_raster):
+    """Same criteria through the chunked process-pool pipeline."""
+    sites = synthetic.site_points(n_sites)
+    table = measure(criterion_table, sites, hazards=hazards, depth_raster=depth_raster)
+    assert len(table) == n_sites
@@ -0,0 +1,26 @@
+"""Results store: filtered comparison query over ``n_sites`` past runs."""
+import pyarrow.dataset as ds
+import pytest
+
+import synthetic
+from landfill_sdss.results import ResultsStore
+from landfill_sdss.runner import scenario_metrics
+
+
+@pytest.fixture
+def store(n_sites, tmp_path):
+    s = ResultsStore(tmp_path / 'results')
+    for i in range(n_sites):
+        sc = synthetic.scenario(i)
+        s.record(sc, scenario_metrics(sc))
+    s.compact()
+    return s
+
+
+def bench_results_query(measure, store, n_sites):
+    def run():
+        df = store.scan('runs', filter=ds.field('spatial_params.buffer_installed'),
+                        columns=['run_id', 'added_capacity_tons', 'voc_ppb'])
+        return df.groupby('voc_ppb')['added_capacity_tons'].mean()
+
+    assert len(measure(run)) >= 1
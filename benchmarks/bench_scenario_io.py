@@ -0,0 +1,15 @@
+"""Scenario JSON round trip (what landfill_scenario_app.py writes)."""
+import json
+
+import synthetic
+
+
+def bench_scenario_io(measure, n_sites, tmp_path):
+    paths = [tmp_path / f"scenario_{i}.json" for i in range(n_sites)]
+
+    def run():
+        for i, p in enumerate(paths):
+            synthetic.write_scenario(p, i)
+        return [json.loads(p.read_text()) for p in paths]
+
+    assert len(measure(run)) == n_sites
@@ -0,0 +1,62 @@
+"""Feasibility scoring, allocation and phase projection (allocation app)."""
+import pandas as pd
+import pytest
+
+import synthetic
+from landfill_sdss.pipeline import allocation_graph
+from landfill_sdss.scoring import DEFAULT_WEIGHTS, feasibility
+
+DURATIONS = [5, 5, 10]
+
+
+@pytest.fixture
+def sites(n_sites):
+    return synthetic.site_rows(n_sites)
+
+
+def _alloc(sites):
+    # every third site takes 100 t/d
+    return {s['Site']: (100 if i % 3 == 0 else 0) for i, s in enumerate(sites)}
+
+
+def bench_feasibility(measure, sites):
+    ndf = pd.DataFrame(sites)
+    assert len(measure(feasibility, ndf, DEFAULT_WEIGHTS)) == len(sites)
+
+
+def bench_allocation(measure, sites):
+    alloc = _alloc(sites)
+
+    def run():
+        # fresh graph each round: cold path through site_data -> allocation
+        return allocation_graph().get('allocation', sites=sites, weights=DEFAULT_WEIGHTS, alloc=alloc)
+
+    measure(run)
+
+
+def bench_phase_projection(measure, sites):
+    g = allocation_graph()
+    alloc = _alloc(sites)
+    g.get('allocation', sites=sites, weights=DEFAULT_WEIGHTS, alloc=alloc)
+
+    def run():
+        g.invalidate('phases')
+        return g.get('phases', sites=sites, weights=DEFAULT_WEIGHTS, alloc=alloc, durations=DURATIONS)
+
+    assert len(measure(run)) == len(DURATIONS)
+
+
+def bench_rerun_phase_change(measure, sites):
+    """Warm graph, only a phase duration changes: the Streamlit rerun path."""
+    g = allocation_graph()
+    alloc = _alloc(sites)
+    cols = ['Site', 'Assigned_tpd', 'Tipping_Fee', 'Service_Horizon_(yr)', 'Electric_Power_MW',
+            'Design_Capacity_tpd', 'EJ_Rating', 'Composite']
+    toggle = iter(range(10**9))
+
+    def run():
+        first = 5 + next(toggle) % 2
+        return g.get('display', sites=sites, weights=DEFAULT_WEIGHTS, alloc=alloc,
+                     durations=[first, 20 - first], display_cols=cols)
+
+    measure(run)
@@ -0,0 +1,17 @@
+"""Cold import of the app modules (fresh interpreter, no spatial stack)."""
+import subprocess
+import sys
+
+from landfill_sdss.config import ROOT_DIR
+from landfill_sdss.lazy import HEAVY
+from landfill_sdss.startup import APP_MODULES, loaded_packages
+
+
+def _cold_import():
+    subprocess.run([sys.executable, '-c', 'import ' + ', '.join(APP_MODULES)],
+                   check=True, cwd=ROOT_DIR)
+
+
+def bench_app_cold_import(measure):
+    measure(_cold_import)
+    assert not set(loaded_packages(APP_MODULES)) & set(HEAVY)
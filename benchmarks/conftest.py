@@ -0,0 +1,109 @@
+"""Benchmark harness: timing via pytest-benchmark, plus peak memory and a
+stored baseline so regressions fail the run.
+
+    pytest benchmarks                          # 9 / 100 sites
+    pytest benchmarks --bench-scale medium     # ... and 1 000 sites
+    pytest benchmarks --bench-scale full       # ... up to 10 000 sites
+    pytest benchmarks --save-baseline          # record benchmarks/baseline.json
+    pytest benchmarks --regression-threshold 0.5
+
+Every case records mean wall time and tracemalloc peak; after the session
+they are written to ``benchmarks/results/latest.json`` and compared with
+``benchmarks/baseline.json`` (if present). A case whose time or peak memory
+grew by more than the threshold is reported and fails the session.
+"""
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))   # landfill_sdss
+sys.path.insert(0, str(BENCH_DIR))          # synthetic
+
+BASELINE = BENCH_DIR / 'baseline.json'
+RESULTS  = BENCH_DIR / 'results' / 'latest.json'
+
+SCALES = {
+    'small':  [9, 100],
+    'medium': [9, 100, 1_000],
+    'full':   [9, 100, 1_000, 10_000],
+}
+
+_results = {}
+
+
+def pytest_addoption(parser):
+    g = parser.getgroup('sdss benchmarks')
+    g.addoption('--bench-scale', choices=sorted(SCALES), default='small',
+                help='candidate counts to run (small: up to 100, full: up to 10^4 sites)')
+    g.addoption('--save-baseline', action='store_true',
+                help='overwrite benchmarks/baseline.json with this run')
+    g.addoption('--regression-threshold', type=float, default=0.25,
+                help='allowed relative growth in time / peak memory (default 0.25)')
+
+
+def pytest_generate_tests(metafunc):
+    if 'n_sites' in metafunc.fixturenames:
+        metafunc.parametrize('n_sites', SCALES[metafunc.config.getoption('bench_scale')])
+
+
+@pytest.fixture
+def measure(benchmark, request):
+    """``measure(func, *args)``: time it, then record one traced peak."""
+    def run(func, *args, **kwargs):
+        result = benchmark(func, *args, **kwargs)
+        tracemalloc.start()
+        func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        benchmark.extra_info['peak_mb'] = peak / 2**20
+        _results[request.node.nodeid.split('::', 1)[1]] = {
+            'mean_s': benchmark.stats.stats.mean,
+            'peak_mb': peak / 2**20,
+        }
+        return result
+    return run
+
+
+def _regressions(current, baseline, threshold):
+    out = []
+    for case, now in sorted(current.items()):
+        before = baseline.get(case)
+        if not before:
+            continue
+        for metric in ('mean_s', 'peak_mb'):
+            if before[metric] > 0 and now[metric] > before[metric] * (1 + threshold):
+                out.append(f"{case}: {metric} {before[metric]:.4g} -> {now[metric]:.4g}")
+    return out
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if not _results:
+        return
+    RESULTS.parent.mkdir(exist_ok=True)
+    RESULTS.write_text(json.dumps(_results, indent=2, sort_keys=True))
+    config = session.config
+    if config.getoption('save_baseline'):
+        BASELINE.write_text(json.dumps(_results, indent=2, sort_keys=True))
+        return
+    if BASELINE.exists():
+        found = _regressions(_results, json.loads(BASELINE.read_text()),
+                             config.getoption('regression_threshold'))
+        session.config._sdss_regressions = found
+        if found:
+            session.exitstatus = 1
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if _results:
+        terminalreporter.section('peak memory (tracemalloc)')
+        for case, r in sorted(_results.items()):
+            terminalreporter.write_line(f"{case:<60} {r['peak_mb']:9.2f} MB")
+    found = getattr(config, '_sdss_regressions', None)
+    if found:
+        terminalreporter.section('regressions vs benchmarks/baseline.json', red=True)
+        for line in found:
+            terminalreporter.write_line(line, red=True)
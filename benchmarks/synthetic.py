@@ -0,0 +1,101 @@
+"""Synthetic SDSS inputs at arbitrary scale (no network, no real data).
+
+Everything lives inside a New York–sized extent in EPSG:2260 so the
+"statewide" layers have realistic densities and geometry sizes.
+"""
+import json
+
+import geopandas as gpd
+import numpy as np
+import rasterio
+from rasterio.transform import from_origin
+from shapely.geometry import box
+
+from landfill_sdss.config import BUFFER_FT, TARGET_CRS
+
+# rough NY state extent in EPSG:2260 feet
+NY_BOUNDS = (-870_000, 630_000, 1_090_000, 2_250_000)
+
+
+def site_rows(n, seed=0):
+    """Site dicts shaped like the evil-streamlit ``site_data`` list."""
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            'Site': f"Synthetic Site {i}",
+            'Tipping_Fee': float(rng.uniform(45, 105)),
+            'Project_Name': f"Synthetic Project {i}",
+            'Design_Capacity_tpd': int(rng.integers(300, 3000)),
+            'Service_Horizon_(yr)': int(rng.integers(5, 40)),
+            'Electric_Power_MW': float(rng.uniform(0, 45)),
+            'Hydrological_Risk': float(rng.uniform(0, 1)),
+            'EJ_Rating': float(rng.uniform(0, 1)),
+            'Dist_to_rail_mi': float(rng.uniform(0, 10)),
+            'Dist_to_hwy_mi': float(rng.uniform(0, 5)),
+        }
+        for i in range(n)
+    ]
+
+
+def site_points(n, seed=0, bounds=NY_BOUNDS):
+    rng = np.random.default_rng(seed)
+    minx, miny, maxx, maxy = bounds
+    return gpd.GeoDataFrame(
+        {'Site': [f"Synthetic Site {i}" for i in range(n)]},
+        geometry=gpd.points_from_xy(rng.uniform(minx, maxx, n), rng.uniform(miny, maxy, n)),
+        crs=TARGET_CRS)
+
+
+def site_buffers(n, seed=0):
+    pts = site_points(n, seed)
+    pts['geometry'] = pts.geometry.buffer(BUFFER_FT)
+    return pts
+
+
+def hazard_layer(n, seed=1, bounds=NY_BOUNDS, radius=(500, 8000)):
+    """``n`` blob-shaped hazard polygons (floodplain / wetland stand-ins)."""
+    rng = np.random.default_rng(seed)
+    minx, miny, maxx, maxy = bounds
+    pts = gpd.points_from_xy(rng.uniform(minx, maxx, n), rng.uniform(miny, maxy, n))
+    return gpd.GeoDataFrame(geometry=pts.buffer(rng.uniform(*radius, n), 8), crs=TARGET_CRS)
+
+
+def block_grid(n, seed=2, bounds=NY_BOUNDS):
+    """~``n`` square census blocks with %low-income / %POC attributes."""
+    rng = np.random.default_rng(seed)
+    minx, miny, maxx, maxy = bounds
+    side = int(np.ceil(np.sqrt(n)))
+    w, h = (maxx - minx) / side, (maxy - miny) / side
+    cells = [box(minx + i * w, miny + j * h, minx + (i + 1) * w, miny + (j + 1) * h)
+             for i in range(side) for j in range(side)]
+    return gpd.GeoDataFrame({'pct_low_income': rng.random(len(cells)),
+                             'pct_poc': rng.random(len(cells))},
+                            geometry=cells, crs=TARGET_CRS)
+
+
+def write_raster(path, cells=2000, seed=3, bounds=NY_BOUNDS, nodata=-9999.0):
+    """Square float32 GeoTIFF covering ``bounds`` with uniform noise."""
+    rng = np.random.default_rng(seed)
+    minx, miny, maxx, maxy = bounds
+    res = max(maxx - minx, maxy - miny) / cells
+    with rasterio.open(path, 'w', driver='GTiff', width=cells, height=cells, count=1,
+                       dtype='float32', crs=TARGET_CRS, nodata=nodata, tiled=True,
+                       transform=from_origin(minx, maxy, res, res)) as dst:
+        dst.write(rng.random((1, cells, cells), dtype='float32') * 3)
+    return path
+
+
+def scenario(i=0):
+    return {
+        'spatial_params': {'expansion_acreage': 30 + i % 70, 'height_increase_ft': 50 + i % 50,
+                           'buffer_installed': bool(i % 2)},
+        'nonspatial_params': {'fill_rate_tpd': 7500, 'turbine_efficiency_pct': 34.5,
+                              'rng_upgrade': False},
+        'external_drivers': {'policy_pressure': {'active': False}},
+    }
+
+
+def write_scenario(path, i=0):
+    with open(path, 'w') as f:
+        json.dump(scenario(i), f, indent=2)
+    return path
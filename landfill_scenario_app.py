@@ -1,6 +1,11 @@
 import streamlit as st
-import subprocess
 import json
+import uuid
+from pathlib import Path
+
+from landfill_sdss.jobs import JobQueue, start_pool
+from landfill_sdss.profiling import Recorder, performance_panel, stage, use_recorder
+from landfill_sdss.results import ResultsStore
 
 st.set_page_config(page_title="Seneca Hills Landfill", layout="wide")
 
@@ -41,28 +46,82 @@ scenario = {
 st.subheader("Current Scenario")
 st.json(scenario)
 
-# --- Run Model Button ---
+# --- Run Model (queued) ---
+# Runs go through the SQLite job queue; one worker pool per server process.
+@st.cache_resource
+def job_queue():
+    start_pool()
+    return JobQueue()
+
+jobs = job_queue()
+# the owner id lives in the URL, so a reload or app restart finds its jobs again
+if 'owner' not in st.query_params:
+    st.query_params['owner'] = uuid.uuid4().hex[:8]
+owner = st.query_params['owner']
+perf = use_recorder(st.session_state.setdefault('perf', Recorder()))
+perf.new_run()
+# allocation tracing costs several times a stage's run time: only while shown
+perf.trace_allocs = st.session_state.get('show_perf', False)
 if st.button("Run Scenario Model!"):
-    st.success("Scenario launched!")
-    # Here you would normally save to JSON, then call your QGIS backend script.
+    with stage('submit'):
+        job_id = jobs.submit(scenario, owner=owner)
+    # keep the latest scenario next to the app, as before
     with open("scenario.json", "w") as f:
         json.dump(scenario, f, indent=2)
+    st.success(f"Scenario queued as job `{job_id}`")
+
+
+@st.fragment(run_every=2)
+def job_status():
+    for job in jobs.list(owner, limit=10):
+        job_id = job['id']
+        label = f"Job {job_id}: {job['status']}"
+        with st.expander(label, expanded=job['status'] in ('queued', 'running')):
+            if job['status'] == 'queued':
+                st.caption("Waiting for a free worker...")
+                if st.button("Cancel", key=f"cancel-{job_id}"):
+                    jobs.cancel(job_id)
+            elif job['status'] == 'running':
+                st.progress(job['progress'], text=job['message'] or '')
+            elif job['status'] == 'done':
+                took = job['finished'] - job['started']
+                st.success(f"QGIS Model processing completed in {took:,.1f} s")
+                for out in job['outputs']:
+                    st.download_button(Path(out).name, Path(out).read_bytes(),
+                                       file_name=Path(out).name, key=f"{job_id}-{out}")
+            elif job['status'] == 'failed':
+                st.error("QGIS Model processing failed.")
+                st.code(job['error'] or '', language=None)
+            if job['stages']:
+                st.table([{k: s.get(k) for k in ('stage', 'wall_s', 'cpu_s', 'peak_mb')}
+                          for s in job['stages']])
+
+if jobs.list(owner, limit=1):
+    st.subheader("Model Runs")
+    job_status()
+
+# --- Past runs (results store, every completed run is appended) ---
+# a toggle, not an expander: a collapsed expander's body still runs (and
+# queries the store) on every rerun
+if st.toggle("Compare past runs", value=False, key='compare_runs'):
+    results = ResultsStore()
+    runs = results.recent('scenario', limit=200)
+    if runs.empty:
+        st.caption("No completed runs yet.")
+    else:
+        picked = st.multiselect("Runs", runs['run_id'].tolist(), default=runs['run_id'].head(3).tolist())
+        if picked:
+            st.dataframe(results.compare(picked).astype(str))
 
-    # Example subprocess to call a QGIS Processing script
-    try:
-        subprocess.run([
-            "python3", "qgis_model_runner.py", "scenario.json"
-        ], check=True)
-        st.success("QGIS Model processing completed successfully!")
-    except subprocess.CalledProcessError:
-        st.error("QGIS Model processing failed. Check logs.")
+if st.sidebar.checkbox("Show performance", value=False, key='show_perf'):
+    performance_panel(st, perf)
 
 # --- Instructions ---
 st.info("""
 **Other stuff**
-1. Streamlit saves `scenario.json` file.
-2. Streamlit triggers an external call to a Python script (e.g., `qgis_model_runner.py`).
-3. `qgis_model_runner.py` reads `scenario.json`, opens QGIS Processing Engine, modifies layers, runs tools (but not now ofc)
+1. Streamlit queues the scenario as a job (`.sdss_cache/jobs.sqlite`) and saves `scenario.json`.
+2. A worker process picks the job up and calls a Python script (e.g., `qgis_model_runner.py`).
+3. `qgis_model_runner.py` hands the scenario to that worker's own warm headless QGIS runner (`landfill_sdss.runner`), which keeps the Processing Engine and project loaded between runs
 4. Outputs (e.g., updated maps, rasters, reports) are saved and can be reloaded here.
 """)
 
@@ -0,0 +1 @@
+"""Shared building blocks for the landfill SDSS scripts and Streamlit apps."""
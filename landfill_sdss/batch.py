@@ -0,0 +1,199 @@
+"""Per-site criterion pipeline (hydro risk + EJ metrics) over a process pool.
+
+``python-ex.py`` / ``python-ej-ex.py`` compute the criteria one site at a
+time, and the buffer ∩ layer intersections keep one core busy. Here the
+candidate sites are Hilbert-sorted (neighbouring sites share a chunk),
+split into chunks and scored by worker processes. Each worker reads every
+layer once from its memory-mapped GeoParquet copy (registry cache, or a
+temporary file for in-memory frames), opens the rasters once, and then
+runs the ``criteria`` functions for every site of every chunk it gets.
+Results stream back per chunk (``iter_criteria``) or are collected into a
+table (``criterion_table``).
+
+``max_memory_mb`` caps the pool: each worker is estimated at
+``WORKER_BASE_MB`` plus ``INMEM_FACTOR`` × the Parquet size of the layers
+it holds, and the worker count is lowered until the total fits.
+
+    python -m landfill_sdss.batch landfills.geojson --hazard fema_floodplain.shp \\
+        --raster air=air_toxics.tif --blocks census_bg.shp --tracts ej_tracts.shp
+"""
+import argparse
+import math
+import os
+import shutil
+import tempfile
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import ExitStack
+from itertools import islice
+from pathlib import Path
+
+import pandas as pd
+
+from .config import BUFFER_FT, CACHE_DIR, TARGET_CRS
+from .criteria import ej_metrics, hydro_fractions, hydro_risk
+from .layers import REGISTRY, hilbert_sorted, load_layer, raster_path
+from .lazy import lazy_import
+
+gpd = lazy_import('geopandas')
+rasterio = lazy_import('rasterio')
+shapely = lazy_import('shapely')
+
+WORKER_BASE_MB = 200   # interpreter + geopandas/rasterio per worker
+INMEM_FACTOR   = 4     # GeoDataFrame size relative to its Parquet file
+CHUNKS_PER_WORKER = 4
+
+_W = {}  # per-worker state, filled by _init_worker
+
+
+# --- Layer staging (parent) ---
+def _stage_layer(layer, tmp):
+    """Parquet path for a registry name, file path or in-memory GeoDataFrame."""
+    if isinstance(layer, gpd.GeoDataFrame):
+        path = Path(tmp) / f"{uuid.uuid4().hex[:8]}.parquet"
+        hilbert_sorted(layer.to_crs(TARGET_CRS)).to_parquet(path, index=False)
+        return path
+    return REGISTRY.ensure(str(layer))
+
+
+def plan_workers(layer_paths, workers=None, max_memory_mb=None):
+    """Worker count after applying the memory cap (at least 1)."""
+    workers = workers or os.cpu_count()
+    if max_memory_mb:
+        layers_mb = sum(Path(p).stat().st_size for p in layer_paths) / 2**20
+        per_worker = WORKER_BASE_MB + INMEM_FACTOR * layers_mb
+        workers = min(workers, max(1, int(max_memory_mb // per_worker)))
+    return workers
+
+
+# --- Worker ---
+def _read(path):
+    gdf = gpd.read_parquet(path, memory_map=True)
+    gdf.sindex  # build the spatial index once; every overlay reuses it
+    return gdf
+
+
+def _init_worker(spec):
+    stack = ExitStack()   # raster handles stay open for the worker's lifetime
+    _W.update(
+        stack=stack,
+        buffer_ft=spec['buffer_ft'],
+        hazards={name: _read(p) for name, p in spec['hazards'].items()},
+        depth=stack.enter_context(rasterio.open(spec['depth'])) if spec['depth'] else None,
+        rasters={k: stack.enter_context(rasterio.open(p)) for k, p in spec['rasters'].items()},
+        blocks=_read(spec['blocks']) if spec['blocks'] else None,
+        tracts=_read(spec['tracts']).geometry.centroid if spec['tracts'] else None,
+    )
+
+
+def _near(layer, geom):
+    """Rows of ``layer`` whose bbox meets ``geom``.
+
+    gpd.overlay validates every geometry of both inputs on each call, so
+    handing it the few candidate rows instead of the statewide layer keeps
+    the per-site cost independent of layer size; the result is identical.
+    """
+    return layer.iloc[layer.sindex.query(geom)]
+
+
+def _score_chunk(chunk):
+    """Criterion rows for one chunk of (position, site, WKB geometry)."""
+    rows = []
+    for pos, site, wkb in chunk:
+        buf = gpd.GeoSeries([shapely.from_wkb(wkb)], crs=TARGET_CRS).buffer(_W['buffer_ft'])
+        geom = buf.iloc[0]
+        row = {'_pos': pos, 'Site': site}
+        if _W['hazards'] or _W['depth'] is not None:
+            near = {n: _near(layer, geom) for n, layer in _W['hazards'].items()}
+            fractions = hydro_fractions(buf, near, _W['depth'])
+            row.update(fractions, HydroRisk=hydro_risk(fractions))
+        if _W['rasters'] or _W['blocks'] is not None or _W['tracts'] is not None:
+            blocks = _near(_W['blocks'], geom) if _W['blocks'] is not None else None
+            row.update(ej_metrics(geom, _W['rasters'], blocks, _W['tracts']))
+        rows.append(row)
+    return rows
+
+
+# --- Driver ---
+def iter_criteria(sites, site_col='Site', hazards=None, depth_raster=None, ej_rasters=None,
+                  blocks=None, tracts=None, buffer_ft=BUFFER_FT, workers=None,
+                  chunk_size=None, max_memory_mb=None):
+    """Yield lists of criterion rows as chunks finish (in completion order).
+
+    ``sites``: GeoDataFrame of site footprints/points (any CRS).
+    ``hazards``: {name: layer} for hydro risk; layers are registry names,
+    file paths or GeoDataFrames. ``depth_raster`` / ``ej_rasters``
+    ({'air': path, ...}) are raster files; each EJ input adds its own metric
+    (rasters: their means, ``blocks`` with pct_low_income / pct_poc: demo,
+    ``tracts``: prox). Rows carry ``_pos``, the
+    site's position in ``sites``.
+    """
+    hazards, ej_rasters = hazards or {}, ej_rasters or {}
+    sites = sites.to_crs(TARGET_CRS).reset_index(drop=True)
+    sites['_pos'] = range(len(sites))
+    sites = hilbert_sorted(sites)
+    items = list(zip(sites['_pos'], sites[site_col], shapely.to_wkb(sites.geometry.values)))
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=CACHE_DIR, prefix='batch-')
+    try:
+        spec = {
+            'buffer_ft': buffer_ft,
+            'hazards': {n: _stage_layer(l, tmp) for n, l in hazards.items()},
+            'depth': raster_path(depth_raster) if depth_raster else None,
+            'rasters': {k: raster_path(p) for k, p in ej_rasters.items()},
+            'blocks': _stage_layer(blocks, tmp) if blocks is not None else None,
+            'tracts': _stage_layer(tracts, tmp) if tracts is not None else None,
+        }
+        held = [*spec['hazards'].values(), *(p for p in (spec['blocks'], spec['tracts']) if p)]
+        workers = min(plan_workers(held, workers, max_memory_mb), max(1, len(items)))
+        size = chunk_size or max(1, math.ceil(len(items) / (workers * CHUNKS_PER_WORKER)))
+        chunks = iter([items[i:i + size] for i in range(0, len(items), size)])
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(spec,)) as pool:
+            # at most two chunks in flight per worker, so finished rows are
+            # handed back instead of piling up behind the whole site list
+            pending = {pool.submit(_score_chunk, c) for c in islice(chunks, 2 * workers)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    yield fut.result()
+                pending |= {pool.submit(_score_chunk, c) for c in islice(chunks, len(done))}
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def criterion_table(sites, **kwargs):
+    """All criterion rows for ``sites`` as one DataFrame, in input order."""
+    rows = [r for chunk in iter_criteria(sites, **kwargs) for r in chunk]
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return df
+    return df.sort_values('_pos').drop(columns='_pos').reset_index(drop=True)
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('sites', help='site layer (registry name or file)')
+    ap.add_argument('--site-col', default='Site')
+    ap.add_argument('--hazard', action='append', default=[], help='hazard layer (repeatable)')
+    ap.add_argument('--depth', help='depth-to-water raster')
+    ap.add_argument('--raster', action='append', default=[], metavar='NAME=PATH',
+                    help='EJ raster, e.g. air=air_toxics.tif (repeatable)')
+    ap.add_argument('--blocks', help='census blocks with pct_low_income / pct_poc')
+    ap.add_argument('--tracts', help='EJ tracts (proximity)')
+    ap.add_argument('--workers', type=int)
+    ap.add_argument('--chunk-size', type=int)
+    ap.add_argument('--max-memory-mb', type=float)
+    ap.add_argument('--out', help='write the table to this CSV')
+    a = ap.parse_args()
+
+    table = criterion_table(
+        load_layer(a.sites), site_col=a.site_col,
+        hazards={Path(h).stem: h for h in a.hazard}, depth_raster=a.depth,
+        ej_rasters=dict(r.split('=', 1) for r in a.raster), blocks=a.blocks, tracts=a.tracts,
+        workers=a.workers, chunk_size=a.chunk_size, max_memory_mb=a.max_memory_mb)
+    if a.out:
+        table.to_csv(a.out, index=False)
+    print(table.to_string(index=False))
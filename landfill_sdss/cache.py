@@ -0,0 +1,23 @@
+"""On-disk cache helpers: content digests and cache file naming."""
+import hashlib
+from pathlib import Path
+
+from .config import CACHE_DIR
+
+CHUNK = 1 << 20
+
+
+def file_digest(path, length=16):
+    """Short sha1 of a file's bytes, used to key derived artifacts."""
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(CHUNK), b''):
+            h.update(block)
+    return h.hexdigest()[:length]
+
+
+def cache_path(kind, key, suffix):
+    """Return CACHE_DIR/<kind>/<key><suffix>, creating the directory."""
+    d = Path(CACHE_DIR) / kind
+    d.mkdir(parents=True, exist_ok=True)
+    return d / f"{key}{suffix}"
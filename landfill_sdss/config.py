@@ -0,0 +1,19 @@
+"""Project-wide constants: CRS, buffer distance and data/cache locations."""
+import os
+from pathlib import Path
+
+# target CRS
+TARGET_CRS = 'EPSG:2260'  # NAD83 / New York East (ftUS)
+FT_PER_M   = 3.28084
+BUFFER_FT  = 500 * FT_PER_M  # 500 m ≈ 1 640 ft
+
+# --- Paths (relative to the repo root, not the caller's cwd) ---
+ROOT_DIR  = Path(__file__).resolve().parents[1]
+DATA_DIR  = ROOT_DIR / 'SDSS'
+CACHE_DIR = ROOT_DIR / '.sdss_cache'
+
+DAC_ZIP    = DATA_DIR / '5-EJ' / 'NYS_Disadvantaged_Communities_(DAC).zip'
+DAC_MEMBER = 'NYS_Disadvantaged_Communities_(DAC).shp'
+
+# land boundary of the study area (NYS state or county polygons); not shipped
+STUDY_AREA = Path(os.environ.get('SDSS_STUDY_AREA', DATA_DIR / '0-Study-Area' / 'nys_boundary.geojson'))
@@ -0,0 +1,136 @@
+"""Per-site criterion functions (hydro risk, EJ) used by the analysis scripts.
+
+These are the computations from ``python-ex.py`` / ``python-ej-ex.py`` as
+callables, so the scripts, the benchmarks and any batch runner share one
+implementation. All geometries are expected in EPSG:2260 (feet).
+"""
+import numpy as np
+import pandas as pd
+
+from .config import TARGET_CRS
+from .lazy import lazy_import
+
+gpd = lazy_import('geopandas')
+rio_mask = lazy_import('rasterio.mask')
+shapely_geometry = lazy_import('shapely.geometry')
+
+FT_PER_MI = 5280
+EJ_WEIGHTS = {'air': 0.4, 'diesel': 0.25, 'prox': 0.2, 'demo': 0.15}
+EJ_METRICS = ['air', 'diesel', 'demo', 'prox']
+
+
+# --- Hydro risk ---
+def hazard_fraction(buffer_geom, hazard):
+    """Share of the buffer area covered by a vector hazard layer."""
+    if hazard.empty:
+        return 0.0
+    inter = gpd.overlay(
+        gpd.GeoDataFrame(geometry=buffer_geom, crs=TARGET_CRS),
+        hazard, how='intersection'
+    )
+    return inter.geometry.area.sum() / buffer_geom.area.sum()
+
+
+def depth_to_water_fraction(src, buffer_geom, threshold=1.0):
+    """Share of valid raster cells in the buffer with depth-to-water < threshold."""
+    out_image, _ = rio_mask.mask(src, buffer_geom.geometry, crop=True)
+    data = out_image[0]
+    valid = data != src.nodata
+    hazard = (data < threshold) & valid
+    return hazard.sum() / valid.sum()
+
+
+def hydro_fractions(buffer_geom, hazards, depth_src=None):
+    """{layer: fraction} for every hazard layer (+ depth-to-water raster)."""
+    fractions = {name: hazard_fraction(buffer_geom, layer) for name, layer in hazards.items()}
+    if depth_src is not None:
+        fractions['depth_to_water'] = depth_to_water_fraction(depth_src, buffer_geom)
+    return fractions
+
+
+def hydro_risk(fractions):
+    """Composite HydroRisk: mean of the layer fractions."""
+    return float(np.mean(list(fractions.values())))
+
+
+# --- Environmental justice ---
+def raster_mean(src, geom):
+    # masked read: cells outside the buffer and nodata cells are both masked,
+    # also for rasters without a nodata value (where the fill would be 0)
+    arr, _ = rio_mask.mask(src, [shapely_geometry.mapping(geom)], crop=True, filled=False)
+    data = arr[0].compressed()
+    return float(data.mean()) if data.size else float('nan')
+
+
+def demographic_score(blocks, geom):
+    """Area-weighted mean of % low-income and % POC over the buffer."""
+    clipped = gpd.overlay(blocks, gpd.GeoDataFrame(geometry=[geom], crs=TARGET_CRS),
+                          how='intersection')
+    areas = clipped.geometry.area
+    demo_low = (clipped['pct_low_income'] * areas).sum() / areas.sum()
+    demo_poc = (clipped['pct_poc'] * areas).sum() / areas.sum()
+    return float((demo_low + demo_poc) / 2)
+
+
+def proximity_score(tract_centroids, geom):
+    """1 / (miles to the nearest EJ tract centroid + 1)."""
+    nearest_ft = tract_centroids.distance(geom.centroid).min()
+    return float(1 / (nearest_ft / FT_PER_MI + 1))
+
+
+def ej_metrics(geom, raster_srcs, blocks=None, tract_centroids=None):
+    """Raw (un-normalized) EJ metrics for one buffered site.
+
+    ``demo`` / ``prox`` are only computed when ``blocks`` / ``tract_centroids``
+    are given.
+    """
+    vals = {name: raster_mean(src, geom) for name, src in raster_srcs.items()}
+    if blocks is not None:
+        vals['demo'] = demographic_score(blocks, geom)
+    if tract_centroids is not None:
+        vals['prox'] = proximity_score(tract_centroids, geom)
+    return vals
+
+
+def minmax_normalize(df, cols=EJ_METRICS):
+    """Scale each column to [0,1] across the sites in ``df``.
+
+    A column with no spread (all sites equal, or a single site) scores 0.
+    """
+    df = df.copy()
+    for col in cols:
+        mn, mx = df[col].min(), df[col].max()
+        df[col] = (df[col] - mn) / (mx - mn) if mx > mn else 0.0
+    return df
+
+
+def percentile_normalize(df, reference, cols=EJ_METRICS):
+    """Replace each column by its statewide percentile in [0,1].
+
+    ``reference`` is a quantile table (``ej_reference.load_reference``);
+    values are located by binary search, ties take the mid rank. Each row is
+    scored on its own, so adding sites never changes existing scores.
+    """
+    df = df.copy()
+    for col in cols:
+        q = reference[col].to_numpy(float)
+        v = df[col].to_numpy(float)
+        rank = np.searchsorted(q, v, 'left') + np.searchsorted(q, v, 'right')
+        df[col] = np.where(np.isnan(v), np.nan, rank / (2 * len(q)))
+    return df
+
+
+def ej_index(df, weights=EJ_WEIGHTS):
+    return sum(df[c] * w for c, w in weights.items())
+
+
+def ej_table(results, weights=EJ_WEIGHTS, reference=None):
+    """Normalized metrics + EJIndex from a list of {'Site', metric...} rows.
+
+    Without ``reference`` the metrics are min–max scaled across these rows;
+    with a statewide quantile table they are percentiles against it.
+    """
+    df = pd.DataFrame(results)
+    df = minmax_normalize(df) if reference is None else percentile_normalize(df, reference)
+    df['EJIndex'] = ej_index(df, weights)
+    return df
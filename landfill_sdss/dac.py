@@ -0,0 +1,29 @@
+"""NYS Disadvantaged Communities (DAC) layer.
+
+First load reads the shapefile straight out of the zip (GDAL /vsizip/, no
+extract), reprojects to EPSG:2260 and writes a GeoParquet copy with a bbox
+covering column and Hilbert-sorted row groups (see ``layers``). Later loads
+memory-map that file and only read the requested columns / row groups
+hitting ``bbox``.
+"""
+from .layers import REGISTRY
+
+
+def parquet_path():
+    """Cache location for the GeoParquet copy, keyed by the zip's contents."""
+    return REGISTRY.cached_path('dac')
+
+
+def build_dac_parquet():
+    """Convert the zipped shapefile to GeoParquet (EPSG:2260)."""
+    return REGISTRY.build('dac')
+
+
+def load_dac(columns=None, bbox=None):
+    """Load the DAC layer in EPSG:2260.
+
+    ``columns``: attribute columns to read (geometry is always included).
+    ``bbox``: (minx, miny, maxx, maxy) in EPSG:2260 feet; only row groups and
+    rows intersecting it are read.
+    """
+    return REGISTRY.load('dac', columns=columns, bbox=bbox)
@@ -0,0 +1,96 @@
+"""Statewide EJ reference distributions (percentile lookup tables).
+
+``ej_table`` without a reference min–max scales each metric across the
+sites of the current run, so adding one candidate rescales every other
+site. Here the same metrics (``criteria.ej_metrics``: air, diesel, demo,
+prox) are computed once at every DAC tract (a representative point inside
+the tract, buffered like a site) through the ``batch`` pipeline, and
+``LEVELS`` quantiles of each metric are stored as a lookup table:
+
+    .sdss_cache/ej_reference/<key>.parquet   columns: q, air, diesel, demo, prox
+
+``key`` hashes the DAC layer, the rasters, blocks and tracts and the
+buffer, so changed inputs never reuse a stale table. A site's score is
+then its statewide percentile (``criteria.percentile_normalize``), which
+depends on that site alone: new sites are scored one at a time and
+previously cached scores stay valid.
+
+    python -m landfill_sdss.ej_reference build --raster air=air_toxics.tif \\
+        --raster diesel=diesel_pm.tif --blocks census_bg.shp --tracts ej_tracts.shp
+"""
+import argparse
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from .batch import criterion_table
+from .cache import cache_path
+from .config import BUFFER_FT
+from .criteria import EJ_METRICS
+from .layers import REGISTRY, load_layer, raster_path, source_digest
+
+LEVELS = 1001   # quantiles per metric: 0.1 % steps
+
+
+def reference_key(ej_rasters, blocks, tracts, buffer_ft=BUFFER_FT, dac='dac'):
+    """Cache key for the table built from these inputs."""
+    parts = [REGISTRY.cached_path(str(l)).stem for l in (dac, blocks, tracts)]
+    parts += [f"{k}={source_digest(raster_path(p))}" for k, p in sorted(ej_rasters.items())]
+    parts += [f"{buffer_ft:.3f}", str(LEVELS)]
+    return hashlib.sha1('|'.join(parts).encode()).hexdigest()[:16]
+
+
+def reference_points(dac='dac'):
+    """One point per DAC tract (inside the polygon), GEOID as the site name."""
+    tracts = load_layer(dac, columns=['GEOID'])
+    tracts = tracts[~(tracts.geometry.isna() | tracts.geometry.is_empty)]
+    return tracts.assign(Site=tracts['GEOID'].astype(str),
+                         geometry=tracts.geometry.representative_point())[['Site', 'geometry']]
+
+
+def build_reference(ej_rasters, blocks, tracts, buffer_ft=BUFFER_FT, dac='dac',
+                    workers=None, max_memory_mb=None):
+    """Compute the metrics at every DAC tract and write the quantile table; returns its path.
+
+    ``blocks`` / ``tracts`` are registry names or file paths (not frames),
+    so the table can be keyed on their contents.
+    """
+    out = cache_path('ej_reference', reference_key(ej_rasters, blocks, tracts, buffer_ft, dac),
+                     '.parquet')
+    metrics = criterion_table(reference_points(dac), ej_rasters=ej_rasters, blocks=blocks,
+                              tracts=tracts, buffer_ft=buffer_ft, workers=workers,
+                              max_memory_mb=max_memory_mb)
+    q = np.linspace(0, 1, LEVELS)
+    table = pd.DataFrame({'q': q, **{m: np.nanquantile(metrics[m].to_numpy(float), q)
+                                     for m in EJ_METRICS}})
+    table.to_parquet(out, index=False)
+    return out
+
+
+def load_reference(ej_rasters, blocks, tracts, buffer_ft=BUFFER_FT, dac='dac', **kwargs):
+    """The statewide quantile table for these inputs, built on first use."""
+    out = cache_path('ej_reference', reference_key(ej_rasters, blocks, tracts, buffer_ft, dac),
+                     '.parquet')
+    if not out.exists():
+        build_reference(ej_rasters, blocks, tracts, buffer_ft, dac, **kwargs)
+    return pd.read_parquet(out)
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('cmd', choices=['build', 'show'])
+    ap.add_argument('--raster', action='append', default=[], metavar='NAME=PATH',
+                    help='EJ raster, e.g. air=air_toxics.tif (repeatable)')
+    ap.add_argument('--blocks', required=True, help='census blocks with pct_low_income / pct_poc')
+    ap.add_argument('--tracts', required=True, help='EJ tracts (proximity)')
+    ap.add_argument('--dac', default='dac', help='reference tract layer (default: DAC)')
+    ap.add_argument('--workers', type=int)
+    a = ap.parse_args()
+
+    rasters = dict(r.split('=', 1) for r in a.raster)
+    if a.cmd == 'build':
+        print(build_reference(rasters, a.blocks, a.tracts, dac=a.dac, workers=a.workers))
+    else:
+        table = load_reference(rasters, a.blocks, a.tracts, dac=a.dac, workers=a.workers)
+        print(table.iloc[::(LEVELS - 1) // 10].to_string(index=False))
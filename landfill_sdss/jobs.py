@@ -0,0 +1,362 @@
+"""SQLite-backed job queue and worker pool for scenario model runs.
+
+Submitting a scenario is one INSERT and returns a job id immediately; worker
+processes claim queued jobs, run the model runner as a subprocess and write
+progress, stage timings and outputs back to the same database
+(``.sdss_cache/jobs.sqlite``). The app only ever reads job rows, so no
+session waits on a model run.
+
+* Jobs survive restarts and worker crashes: idle workers keep checking for
+  ``running`` jobs whose worker stopped sending heartbeats and put them back
+  in the queue.
+* Fairness: a worker claims the oldest queued job of the submitter with the
+  fewest running jobs, and every run has a timeout, so one user (or one
+  stuck model) cannot hold the whole pool.
+* Each worker has its own warm model runner (``runner.PORT + slot``, passed
+  to the runner script as ``SDSS_RUNNER_PORT``), so workers run scenarios in
+  parallel; on timeout the worker kills the client and restarts its runner.
+
+The runner prints JSON lines on stdout to report progress::
+
+    {"progress": 0.4, "message": "buffering"}
+    {"stage": "buffer", "wall_s": 1.2, "cpu_s": 1.1}
+
+any other output goes to the job's ``log.txt``; files written to the
+``--out`` directory become the job's outputs, and a ``metrics.json`` among
+them is appended to the results store (``landfill_sdss.results``).
+
+    python -m landfill_sdss.jobs worker -n 2      # standalone worker pool
+    python -m landfill_sdss.jobs submit scenario.json
+    python -m landfill_sdss.jobs list
+"""
+import argparse
+import atexit
+import json
+import multiprocessing as mp
+import os
+import queue
+import signal
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from .config import CACHE_DIR, ROOT_DIR
+from .profiling import Recorder, stage, use_recorder
+from .results import ResultsStore
+from .runner import PORT as RUNNER_PORT, restart_server
+
+DB_PATH     = Path(os.environ.get('SDSS_JOBS_DB', CACHE_DIR / 'jobs.sqlite'))
+JOBS_DIR    = CACHE_DIR / 'jobs'
+RUNNER      = os.environ.get('SDSS_MODEL_RUNNER', str(ROOT_DIR / 'qgis_model_runner.py'))
+WORKERS     = int(os.environ.get('SDSS_JOB_WORKERS', 2))
+TIMEOUT_S   = 30 * 60   # per run
+HEARTBEAT_S = 5
+STALE_S     = 6 * HEARTBEAT_S   # no heartbeat for this long -> worker is gone
+POLL_S      = 1.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id        TEXT PRIMARY KEY,
+    owner     TEXT NOT NULL DEFAULT '',
+    status    TEXT NOT NULL,            -- queued | running | done | failed | cancelled
+    scenario  TEXT NOT NULL,            -- JSON
+    submitted REAL NOT NULL,
+    started   REAL,
+    finished  REAL,
+    heartbeat REAL,
+    worker    TEXT,
+    attempts  INTEGER NOT NULL DEFAULT 0,
+    progress  REAL NOT NULL DEFAULT 0,
+    message   TEXT,
+    stages    TEXT NOT NULL DEFAULT '[]',   -- JSON list of stage timings
+    outputs   TEXT NOT NULL DEFAULT '[]',   -- JSON list of file paths
+    error     TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, submitted);
+"""
+JSON_FIELDS = ('scenario', 'stages', 'outputs')
+
+
+def job_dir(job_id):
+    return JOBS_DIR / job_id
+
+
+class JobQueue:
+    """Thin wrapper over the jobs table; safe to share across processes."""
+
+    def __init__(self, path=DB_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as con:
+            con.executescript(SCHEMA)
+
+    def _connect(self):
+        con = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        con.row_factory = sqlite3.Row
+        con.execute('PRAGMA journal_mode=WAL')
+        return con
+
+    def _update(self, job_id, **fields):
+        cols = ', '.join(f"{k} = ?" for k in fields)
+        with self._connect() as con:
+            con.execute(f"UPDATE jobs SET {cols} WHERE id = ?", (*fields.values(), job_id))
+
+    @staticmethod
+    def _row(row):
+        if row is None:
+            return None
+        job = dict(row)
+        for k in JSON_FIELDS:
+            job[k] = json.loads(job[k])
+        return job
+
+    # --- app side ---
+    def submit(self, scenario, owner=''):
+        """Queue ``scenario``; returns the new job id."""
+        job_id = uuid.uuid4().hex[:12]
+        with self._connect() as con:
+            con.execute("INSERT INTO jobs (id, owner, status, scenario, submitted) "
+                        "VALUES (?, ?, 'queued', ?, ?)",
+                        (job_id, owner, json.dumps(scenario), time.time()))
+        return job_id
+
+    def get(self, job_id):
+        with self._connect() as con:
+            return self._row(con.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def list(self, owner=None, limit=50):
+        sql, args = "SELECT * FROM jobs", ()
+        if owner is not None:
+            sql, args = sql + " WHERE owner = ?", (owner,)
+        with self._connect() as con:
+            rows = con.execute(sql + " ORDER BY submitted DESC LIMIT ?", (*args, limit)).fetchall()
+        return [self._row(r) for r in rows]
+
+    def cancel(self, job_id):
+        """Cancel a job that has not started yet; returns True if it was queued."""
+        with self._connect() as con:
+            cur = con.execute("UPDATE jobs SET status = 'cancelled', finished = ? "
+                              "WHERE id = ? AND status = 'queued'", (time.time(), job_id))
+        return cur.rowcount == 1
+
+    # --- worker side ---
+    def claim(self, worker):
+        """Atomically move the next fair-share queued job to ``running``."""
+        now = time.time()
+        with self._connect() as con:
+            con.execute('BEGIN IMMEDIATE')
+            try:
+                row = con.execute("""
+                    SELECT j.id FROM jobs j WHERE j.status = 'queued'
+                    ORDER BY (SELECT COUNT(*) FROM jobs r
+                              WHERE r.status = 'running' AND r.owner = j.owner),
+                             j.submitted
+                    LIMIT 1""").fetchone()
+                if row is None:
+                    con.execute('COMMIT')
+                    return None
+                con.execute("UPDATE jobs SET status = 'running', worker = ?, started = ?, "
+                            "heartbeat = ?, attempts = attempts + 1, progress = 0, "
+                            "message = 'started' WHERE id = ?", (worker, now, now, row['id']))
+                job = self._row(con.execute("SELECT * FROM jobs WHERE id = ?", (row['id'],)).fetchone())
+                con.execute('COMMIT')
+            except BaseException:
+                con.execute('ROLLBACK')
+                raise
+        return job
+
+    def requeue_stale(self, max_attempts=3):
+        """Put running jobs with a dead worker back in the queue (or fail them)."""
+        cutoff = time.time() - STALE_S
+        with self._connect() as con:
+            con.execute("UPDATE jobs SET status = 'failed', finished = ?, "
+                        "error = 'worker lost too many times' "
+                        "WHERE status = 'running' AND heartbeat < ? AND attempts >= ?",
+                        (time.time(), cutoff, max_attempts))
+            cur = con.execute("UPDATE jobs SET status = 'queued', worker = NULL, "
+                              "message = 'requeued after worker restart' "
+                              "WHERE status = 'running' AND heartbeat < ?", (cutoff,))
+        return cur.rowcount
+
+    def heartbeat(self, job_id, progress=None, message=None):
+        fields = {'heartbeat': time.time()}
+        if progress is not None:
+            fields['progress'] = float(progress)
+        if message is not None:
+            fields['message'] = message
+        self._update(job_id, **fields)
+
+    def set_stages(self, job_id, stages):
+        self._update(job_id, stages=json.dumps(stages))
+
+    def finish(self, job_id, outputs, stages):
+        self._update(job_id, status='done', finished=time.time(), progress=1.0,
+                     message='done', outputs=json.dumps(outputs), stages=json.dumps(stages))
+
+    def fail(self, job_id, error, stages=()):
+        self._update(job_id, status='failed', finished=time.time(), error=error,
+                     stages=json.dumps(list(stages)))
+
+
+# --- Worker ---
+def _pump(stream, q):
+    for line in stream:
+        q.put(line)
+    q.put(None)
+
+
+def run_job(jq, job, runner_port=RUNNER_PORT):
+    """Run one claimed job to completion, streaming its events into the table."""
+    d = job_dir(job['id'])
+    out = d / 'out'
+    out.mkdir(parents=True, exist_ok=True)
+    scenario_path = d / 'scenario.json'
+    scenario_path.write_text(json.dumps(job['scenario'], indent=2))
+
+    rec = use_recorder(Recorder(job['id']))
+    stages = []
+    log_path = d / 'log.txt'
+    cmd = [sys.executable, RUNNER, str(scenario_path), '--out', str(out)]
+    deadline = time.time() + TIMEOUT_S
+    with open(log_path, 'a') as log, stage('scenario run', job=job['id']):
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=log, text=True,
+                                cwd=ROOT_DIR, env={**os.environ,
+                                                   'SDSS_RUNNER_PORT': str(runner_port)})
+        lines = queue.Queue()
+        threading.Thread(target=_pump, args=(proc.stdout, lines), daemon=True).start()
+        last_beat, done = 0.0, False
+        while not done:
+            try:
+                line = lines.get(timeout=POLL_S)
+            except queue.Empty:
+                line = ''
+            if line is None:
+                done = True
+            elif line.startswith('{'):
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    event = None
+                if event and 'stage' in event:
+                    stages.append(event)
+                    jq.set_stages(job['id'], stages)
+                if event and ('progress' in event or 'message' in event):
+                    jq.heartbeat(job['id'], event.get('progress'), event.get('message'))
+                    last_beat = time.time()
+                if event is None:
+                    log.write(line)
+            elif line:
+                log.write(line)
+            if time.time() - last_beat > HEARTBEAT_S:
+                jq.heartbeat(job['id'])
+                last_beat = time.time()
+            if time.time() > deadline:
+                proc.kill()
+                proc.wait()
+                jq.fail(job['id'], f"timed out after {TIMEOUT_S} s", stages)
+                # the runner is still busy with the stuck model: replace it
+                restart_server(runner_port)
+                return 'failed'
+        code = proc.wait()
+    stages += [{k: r[k] for k in ('stage', 'wall_s', 'cpu_s', 'peak_mb')} for r in rec.records]
+    if code != 0:
+        tail = log_path.read_text().splitlines()[-20:]
+        jq.fail(job['id'], f"runner exited with {code}:\n" + '\n'.join(tail), stages)
+        return 'failed'
+    metrics = out / 'metrics.json'
+    if metrics.exists():
+        try:
+            ResultsStore().record(job['scenario'], json.loads(metrics.read_text()), run_id=job['id'])
+        except Exception as e:   # the run itself succeeded; keep its outputs
+            with open(log_path, 'a') as log:
+                log.write(f"results store: {type(e).__name__}: {e}\n")
+    jq.finish(job['id'], sorted(str(p) for p in out.rglob('*') if p.is_file()), stages)
+    return 'done'
+
+
+def worker_loop(db_path=DB_PATH, stop=None, slot=0):
+    """Claim and run jobs until ``stop`` (a multiprocessing Event) is set.
+
+    ``slot`` picks this worker's runner port (``runner.PORT + slot``).
+    """
+    jq = JobQueue(db_path)
+    name = f"{os.uname().nodename}:{os.getpid()}"
+    last_check = 0.0
+    while stop is None or not stop.is_set():
+        # not just at startup: a job's worker may die (or the app restart)
+        # after the other workers are already running
+        if time.time() - last_check > HEARTBEAT_S:
+            jq.requeue_stale()
+            last_check = time.time()
+        job = jq.claim(name)
+        if job is None:
+            time.sleep(POLL_S)
+            continue
+        try:
+            run_job(jq, job, RUNNER_PORT + slot)
+        except Exception as e:
+            jq.fail(job['id'], f"{type(e).__name__}: {e}")
+
+
+def start_workers(n=WORKERS, db_path=DB_PATH):
+    """Start ``n`` daemon worker processes; returns (processes, stop event).
+
+    Daemon workers exit with their parent; jobs they were running are
+    requeued through the heartbeat check once they go stale. Not for use
+    inside the Streamlit server (see ``start_pool``).
+    """
+    ctx = mp.get_context('spawn')
+    stop = ctx.Event()
+    procs = [ctx.Process(target=worker_loop, args=(str(db_path), stop, slot), daemon=True)
+             for slot in range(n)]
+    for p in procs:
+        p.start()
+    return procs, stop
+
+
+def start_pool(n=WORKERS, db_path=DB_PATH):
+    """Run the worker pool CLI as a child process (for the apps); returns the Popen.
+
+    Streamlit installs the app script as ``__main__``, and workers spawned
+    from the server would execute it again. In the CLI process ``__main__``
+    is this module, so the workers import it by name instead. The pool stops
+    when the app server exits.
+    """
+    proc = subprocess.Popen([sys.executable, '-m', 'landfill_sdss.jobs', 'worker', '-n', str(n),
+                             '--parent', str(os.getpid())],
+                            cwd=ROOT_DIR, env={**os.environ, 'SDSS_JOBS_DB': str(db_path)})
+    atexit.register(proc.terminate)
+    return proc
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    w = sub.add_parser('worker', help='run a worker pool in the foreground')
+    w.add_argument('-n', type=int, default=WORKERS)
+    w.add_argument('--parent', type=int, help='exit when this process (the app server) exits')
+    s = sub.add_parser('submit', help='queue a scenario JSON file')
+    s.add_argument('scenario')
+    sub.add_parser('list', help='show recent jobs')
+    a = ap.parse_args()
+
+    if a.cmd == 'worker':
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        procs, stop = start_workers(a.n)
+        try:
+            while any(p.is_alive() for p in procs):
+                time.sleep(POLL_S)
+                if a.parent and os.getppid() != a.parent:
+                    break
+        except KeyboardInterrupt:
+            pass
+        stop.set()
+    elif a.cmd == 'submit':
+        print(JobQueue().submit(json.loads(Path(a.scenario).read_text()), owner='cli'))
+    else:
+        for j in JobQueue().list():
+            print(f"{j['id']}  {j['status']:<9} {j['progress']:4.0%}  {j['message'] or ''}")
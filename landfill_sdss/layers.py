@@ -0,0 +1,222 @@
+"""Layer registry: reproject each source layer once, serve the cached copy.
+
+Every analysis script used to call ``.to_crs(TARGET_CRS)`` on each input at
+every run. Here a source is read and reprojected once; the result is written
+to ``.sdss_cache/layers/<stem>-<source hash>-<crs>.parquet`` and later loads
+read that file directly (memory-mapped, optional column / bbox pruning).
+Changing the source file changes its hash, so stale copies are never served.
+Copies are written to a temporary file and renamed into place, so worker
+processes loading the same layer never read a half-written file; pools
+should still ``REGISTRY.ensure`` their layers in the parent first, so the
+workers don't all build the same copy.
+"""
+import hashlib
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from .cache import cache_path, file_digest
+from .config import DAC_MEMBER, DAC_ZIP, DATA_DIR, STUDY_AREA, TARGET_CRS
+from .lazy import lazy_import
+
+gpd = lazy_import('geopandas')
+rasterio = lazy_import('rasterio')
+
+ROW_GROUP_SIZE = 128  # small groups -> bbox filter can skip most of the file
+SHP_SIDECARS = ('.shp', '.shx', '.dbf', '.prj', '.cpg')
+
+_digests = {}  # (path, size, mtime) -> digest, so a run hashes each file once
+
+
+def source_digest(path):
+    """Content hash of a source; shapefiles include their sidecar files."""
+    path = Path(path)
+    parts = [path]
+    if path.suffix.lower() == '.shp':
+        parts = [path.with_suffix(s) for s in SHP_SIDECARS if path.with_suffix(s).exists()]
+    keys = []
+    for p in parts:
+        st = p.stat()
+        k = (str(p.resolve()), st.st_size, st.st_mtime_ns)
+        if k not in _digests:
+            _digests[k] = file_digest(p)
+        keys.append(_digests[k])
+    if len(keys) == 1:
+        return keys[0]
+    return hashlib.sha1(''.join(keys).encode()).hexdigest()[:16]
+
+
+def read_latlon_csv(path, lat='latitude', lon='longitude'):
+    """Point layer from a CSV with lat/long columns (e.g. Candidates.csv).
+
+    Rows without usable coordinates (the trailing "Totals" row) are dropped.
+    """
+    df = pd.read_csv(path)
+    for col in (lat, lon):
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    df = df.dropna(subset=[lat, lon]).reset_index(drop=True)
+    return gpd.GeoDataFrame(df, geometry=gpd.points_from_xy(df[lon], df[lat]),
+                            crs='EPSG:4326')
+
+
+def read_source(path, member=None):
+    path = Path(path)
+    if path.suffix.lower() == '.csv':
+        return read_latlon_csv(path)
+    if path.suffix.lower() == '.zip':
+        return gpd.read_file(f"/vsizip/{path}/{member}" if member else f"/vsizip/{path}")
+    return gpd.read_file(path)
+
+
+def hilbert_sorted(gdf):
+    """Spatially sort rows so each Parquet row group covers a compact bbox.
+
+    Rows without geometry (e.g. CSV rows missing lat/long) go last.
+    """
+    has_geom = ~(gdf.geometry.isna() | gdf.geometry.is_empty)
+    if has_geom.sum() < 2:
+        return gdf
+    located = gdf[has_geom]
+    located = located.iloc[located.geometry.hilbert_distance().argsort()]
+    return pd.concat([located, gdf[~has_geom]]).reset_index(drop=True)
+
+
+class LayerRegistry:
+    """Named vector layers, each reprojected once to ``crs`` and cached."""
+
+    def __init__(self, crs=TARGET_CRS):
+        self.crs = crs
+        self._sources = {}
+
+    def register(self, name, path, member=None, reader=None):
+        self._sources[name] = (Path(path), member, reader)
+        return name
+
+    def names(self):
+        return list(self._sources)
+
+    def cached_path(self, name):
+        path, member, _ = self._resolve(name)
+        stem = Path(member).stem if member else path.stem
+        key = f"{stem}-{source_digest(path)}-{self.crs.replace(':', '')}"
+        return cache_path('layers', key, '.parquet')
+
+    def build(self, name):
+        """Read + reproject the source and write the GeoParquet copy."""
+        path, member, reader = self._resolve(name)
+        out = self.cached_path(name)
+        gdf = (reader or read_source)(path, member)
+        gdf = gdf.to_crs(self.crs)
+        gdf = hilbert_sorted(gdf)
+        # unique temp name: concurrent builders must not share a partial file
+        tmp = out.with_suffix(f'.{os.getpid()}.tmp')
+        try:
+            gdf.to_parquet(tmp, index=False, write_covering_bbox=True,
+                           row_group_size=ROW_GROUP_SIZE)
+            os.replace(tmp, out)
+        finally:
+            tmp.unlink(missing_ok=True)
+        return out
+
+    def ensure(self, name):
+        """Cached copy of ``name``, built first if missing; returns its path."""
+        out = self.cached_path(name)
+        if not out.exists():
+            self.build(name)
+        return out
+
+    def load(self, name, columns=None, bbox=None):
+        """Projected layer; ``name`` may be a registered name or a file path.
+
+        ``columns``: attribute columns to read (geometry is always included).
+        ``bbox``: (minx, miny, maxx, maxy) in ``crs`` units.
+        """
+        out = self.ensure(name)
+        if columns is not None:
+            columns = list(dict.fromkeys([*columns, 'geometry']))
+        return gpd.read_parquet(out, columns=columns, bbox=bbox, memory_map=True)
+
+    def _resolve(self, name):
+        if name not in self._sources:
+            # ad hoc file path: register under its own path
+            self.register(str(name), name)
+        return self._sources[name]
+
+
+REGISTRY = LayerRegistry()
+REGISTRY.register('dac', DAC_ZIP, member=DAC_MEMBER)
+REGISTRY.register('active_landfills', DATA_DIR / 'Candidate-sites' / 'active-landfills.geojson')
+REGISTRY.register('candidates', DATA_DIR / 'Candidate-sites' / 'Candidates.csv')
+REGISTRY.register('candidates_gpkg', DATA_DIR / 'Candidate-sites' / 'Candidates.gpkg')
+REGISTRY.register('hubs', DATA_DIR / '1-Network-Analysis' / 'hubs.gpkg')
+REGISTRY.register('shortest_paths', DATA_DIR / '1-Network-Analysis' / 'shortest_path_landfills.gpkg')
+REGISTRY.register('study_area', STUDY_AREA)
+
+
+def load_layer(name, columns=None, bbox=None):
+    """Shortcut for ``REGISTRY.load``."""
+    return REGISTRY.load(name, columns=columns, bbox=bbox)
+
+
+# App site name -> Candidates.csv facility, or (lat, lon) for proposed sites
+# that are not in Candidates.csv; None until a real location is in the data
+# (maps fall back to the statewide view).
+SITE_LOCATIONS = {
+    'Seneca Meadows Landfill':         'Seneca Meadows LF (50S08)',
+    'Chaffee Solid Waste Facility':    'Chaffee Solid Waste Facility (15S14)',
+    'DANC Regional Landfill':          'Development Authority of the North Country Landfill [DANC] (23LS0030)',
+    'Bath Landfill Eastern Expansion': 'Bath Sanitary Landfill (51LS0025)',
+    'Hyland Landfill':                 'Hyland Landfill (02S17)',
+    'Bristol Hill Landfill (Cell 5)':  'Bristol Hill SLF (38S14)',
+    # not in Candidates.csv and no surveyed coordinates yet
+    'OCRRA Site 31 Landfill':          None,
+    'Potential Site H (Plattekill)':   None,
+    'Potential Site I (Plattekill)':   None,
+}
+
+
+def site_location(site):
+    """Candidates-style row (latitude, longitude, EPSG:2260 geometry) for ``site``.
+
+    ``site`` is an app site name from ``SITE_LOCATIONS`` or a Candidates.csv
+    facility name; None if it has no known location.
+    """
+    loc = SITE_LOCATIONS.get(site, site)
+    if loc is None:
+        return None
+    if isinstance(loc, tuple):
+        lat, lon = loc
+        pt = gpd.GeoSeries(gpd.points_from_xy([lon], [lat]), crs='EPSG:4326').to_crs(TARGET_CRS)
+        return pd.Series({'Facility Name': site, 'latitude': lat, 'longitude': lon,
+                          'geometry': pt.iloc[0]})
+    cands = load_layer('candidates', columns=['Facility Name', 'latitude', 'longitude'])
+    hit = cands[cands['Facility Name'] == loc]
+    return None if hit.empty else hit.iloc[0]
+
+
+def raster_path(path, crs=TARGET_CRS):
+    """Path to ``path`` in ``crs``: the source itself, or a cached warped copy."""
+    from rasterio.warp import Resampling, calculate_default_transform, reproject
+
+    path = Path(path)
+    with rasterio.open(path) as src:
+        if src.crs and src.crs.to_string() == crs:
+            return path
+        out = cache_path('rasters', f"{path.stem}-{source_digest(path)}-{crs.replace(':', '')}", '.tif')
+        if out.exists():
+            return out
+        transform, width, height = calculate_default_transform(
+            src.crs, crs, src.width, src.height, *src.bounds)
+        meta = src.meta.copy()
+        meta.update(crs=crs, transform=transform, width=width, height=height)
+        tmp = out.with_suffix(f'.{os.getpid()}.tmp.tif')
+        try:
+            with rasterio.open(tmp, 'w', **meta) as dst:
+                for band in range(1, src.count + 1):
+                    reproject(rasterio.band(src, band), rasterio.band(dst, band),
+                              dst_nodata=src.nodata, resampling=Resampling.nearest)
+            os.replace(tmp, out)
+        finally:
+            tmp.unlink(missing_ok=True)
+    return out
@@ -0,0 +1,51 @@
+"""Deferred imports for the heavy geospatial stack.
+
+geopandas, rasterio, shapely & co. take most of a cold start. Modules bind
+them with
+
+    gpd = lazy_import('geopandas')
+
+which costs nothing until the first attribute access (``gpd.read_parquet``),
+i.e. until a spatial stage actually runs. After that the placeholder holds
+the real module's namespace, so hot loops pay a plain attribute lookup.
+
+``python -m landfill_sdss.startup`` reports what the app modules import and
+checks them against the startup budget.
+"""
+import importlib
+import sys
+import types
+
+# imported only on demand anywhere in landfill_sdss
+HEAVY = ('geopandas', 'rasterio', 'shapely', 'pyogrio', 'pyproj', 'scipy',
+         'matplotlib', 'mapbox_vector_tile', 'pydeck', 'fiona')
+
+
+class LazyModule(types.ModuleType):
+    """Placeholder module that imports its target on first attribute access."""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__['_lazy_loaded'] = False
+
+    def _load(self):
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(vars(module))
+        self.__dict__['_lazy_loaded'] = True
+        return module
+
+    def __getattr__(self, attr):
+        if self.__dict__['_lazy_loaded']:
+            # attribute added to the real module after the first load
+            return getattr(importlib.import_module(self.__name__), attr)
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_lazy_loaded'] else 'not loaded'
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_import(name):
+    """Module ``name`` if it is already imported, else a ``LazyModule``."""
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
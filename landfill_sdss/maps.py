@@ -0,0 +1,123 @@
+"""Hydro-Risk / EJ site maps for the Streamlit apps (pydeck MVT layers).
+
+Layers come from the local vector-tile endpoint (see ``tiles``), so the
+browser only downloads the tiles in view instead of whole GeoJSON layers.
+Missing tiles are built by the ``tiles`` CLI in a background process, so
+its worker pool never starts inside the Streamlit server and a rerun never
+waits for it (the DAC tiles take ~20 s); ``map_chart`` shows a placeholder
+until they exist.
+"""
+import subprocess
+import sys
+import threading
+
+from .cache import cache_path
+from .config import ROOT_DIR
+from .layers import site_location
+from .lazy import lazy_import
+from .tiles import serve_tiles, tile_url, tileset_paths
+
+pdk = lazy_import('pydeck')
+
+NY_VIEW = {'latitude': 42.9, 'longitude': -75.5, 'zoom': 6}
+SITE_ZOOM = 11
+
+_base = {}
+_building = {}   # hazards -> tiles CLI process
+_building_lock = threading.Lock()
+
+
+def tile_base(hazards=()):
+    """(base URL, layers) once the tiles exist, else None.
+
+    Missing tiles are built by the tiles CLI in the background (started once
+    per hazard list); the endpoint starts when they are all there.
+    """
+    key = tuple(hazards)
+    if key not in _base:
+        sets = tileset_paths(hazards)
+        if not all(p.exists() for p in sets.values()):
+            with _building_lock:
+                if key not in _building:
+                    cmd = [sys.executable, '-m', 'landfill_sdss.tiles']
+                    for h in hazards:
+                        cmd += ['--hazard', str(h)]
+                    with open(cache_path('tiles', 'build', '.log'), 'a') as log:
+                        _building[key] = subprocess.Popen(cmd, cwd=ROOT_DIR,
+                                                          stdout=subprocess.DEVNULL, stderr=log)
+            return None
+        _base[key] = (serve_tiles(sets), sorted(sets))
+    return _base[key]
+
+
+def tiles_failed(hazards=()):
+    """True if the background tile build for ``hazards`` exited with an error."""
+    proc = _building.get(tuple(hazards))
+    return proc is not None and proc.poll() not in (None, 0)
+
+
+def map_chart(st, deck_fn, site, hazards=()):
+    """``st.pydeck_chart(deck_fn(site))``, or a placeholder while the tiles build."""
+    deck = deck_fn(site, hazards)
+    if deck is not None:
+        st.pydeck_chart(deck)
+        return
+
+    @st.fragment(run_every=2)
+    def placeholder():
+        # polls until the background build is done, then reruns the app
+        if tile_base(hazards) is not None:
+            st.rerun()
+        if tiles_failed(hazards):
+            st.warning("Building map tiles failed, see .sdss_cache/tiles/build.log")
+        else:
+            st.info("Building map tiles…")
+    placeholder()
+
+
+def site_view(site):
+    """View centred on ``site`` (see ``layers.SITE_LOCATIONS``)."""
+    row = site_location(site)
+    if row is None:
+        return pdk.ViewState(**NY_VIEW)
+    return pdk.ViewState(latitude=row['latitude'], longitude=row['longitude'], zoom=SITE_ZOOM)
+
+
+def _mvt(base, layer, **style):
+    return pdk.Layer('MVTLayer', data=tile_url(base, layer), pickable=True,
+                     min_zoom=5, max_zoom=12, **style)
+
+
+def hydro_risk_deck(site, hazards=()):
+    """Hydro-Risk deck, or None while its tiles are still being built."""
+    if tile_base(hazards) is None:
+        return None
+    base, layers = tile_base(hazards)
+    deck_layers = [
+        _mvt(base, name, get_fill_color=[30, 110, 200, 110], get_line_color=[30, 110, 200])
+        for name in layers if name.startswith('hazard_')
+    ]
+    deck_layers += [
+        _mvt(base, 'buffers', get_fill_color=[250, 180, 40, 60], get_line_color=[250, 140, 0],
+             line_width_min_pixels=1),
+        _mvt(base, 'candidates', get_fill_color=[200, 30, 30], point_radius_min_pixels=5),
+    ]
+    return pdk.Deck(layers=deck_layers, initial_view_state=site_view(site),
+                    tooltip={'text': '{Facility Name}'})
+
+
+def ej_deck(site, hazards=()):
+    """EJ deck, or None while its tiles are still being built."""
+    if tile_base(hazards) is None:
+        return None
+    base, _ = tile_base(hazards)
+    deck_layers = [
+        # darker red = higher statewide DAC rank
+        _mvt(base, 'dac', get_fill_color='[180, 255 - properties.Rank_State * 2.3, 60, 140]',
+             get_line_color=[120, 120, 120], line_width_min_pixels=0.5),
+        _mvt(base, 'buffers', get_fill_color=[0, 0, 0, 0], get_line_color=[20, 20, 20],
+             line_width_min_pixels=1),
+        _mvt(base, 'candidates', get_fill_color=[20, 20, 20], point_radius_min_pixels=5),
+    ]
+    return pdk.Deck(layers=deck_layers, initial_view_state=site_view(site),
+                    tooltip={'text': 'DAC rank {Rank_State}\n{County}'})
@@ -0,0 +1,170 @@
+"""Dependency-tracked, memoized computation graph for the allocation apps.
+
+Streamlit reruns the whole script on every widget change. Keeping a
+``Graph`` in ``st.session_state`` lets each rerun ask for the stage it needs;
+a stage only recomputes when its own inputs or an upstream stage changed:
+
+    site_data -> scores -> allocation -> phases -> display
+
+so moving a phase-duration slider re-runs ``phases`` and ``display`` only,
+no matter how many candidate sites there are.
+
+Every recomputed stage is timed through ``profiling.stage``, so the app's
+"Performance" expander shows which stages ran and what they cost.
+
+Inputs are hashed at most once per object: passing the same object again
+(the app calls ``get`` several times per rerun) reuses its key, and a
+``Versioned(value, version)`` input is keyed on ``version`` alone, so a
+large site list costs nothing to re-check when only a slider moved. Inputs
+are treated as immutable: pass a new object (or version) after changing one.
+"""
+import hashlib
+import pickle
+from typing import Any, NamedTuple
+
+import pandas as pd
+
+from .profiling import stage as timed_stage
+from .scoring import composite, feasibility
+
+
+class Versioned(NamedTuple):
+    """Stage input keyed on a caller-supplied version token, not its content."""
+    value: Any
+    version: Any
+
+
+def fingerprint(value):
+    """Stable content hash for stage inputs (DataFrames, dicts, scalars...)."""
+    h = hashlib.sha1()
+    _feed(h, value)
+    return h.hexdigest()
+
+
+def _feed(h, value):
+    if isinstance(value, Versioned):
+        h.update(b'Versioned')
+        _feed(h, value.version)
+    elif isinstance(value, (pd.DataFrame, pd.Series)):
+        h.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+        h.update(repr(list(getattr(value, 'columns', [value.name]))).encode())
+    elif isinstance(value, dict):
+        for k in sorted(value, key=repr):
+            h.update(repr(k).encode())
+            _feed(h, value[k])
+    elif isinstance(value, (list, tuple)):
+        h.update(f"{type(value).__name__}{len(value)}".encode())
+        for v in value:
+            _feed(h, v)
+    else:
+        h.update(pickle.dumps(value))
+
+
+class Graph:
+    """Named stages with declared dependencies; results memoized on inputs.
+
+    ``params`` are the external inputs a stage reads (widget values);
+    ``deps`` are upstream stage names whose results it receives. A stage's
+    key is the hash of its params plus its upstream keys, so an unchanged
+    key means the cached result is still valid.
+    """
+
+    def __init__(self):
+        self._stages = {}
+        self._memo = {}      # stage -> (key, result)
+        self._inputs = {}    # param -> (input object, its fingerprint)
+        self.recomputed = []  # stages actually run during the last get()
+
+    def stage(self, name, deps=(), params=()):
+        def register(func):
+            self._stages[name] = (func, tuple(deps), tuple(params))
+            return func
+        return register
+
+    def get(self, name, **inputs):
+        self.recomputed = []
+        return self._get(name, inputs, {})[1]
+
+    def _get(self, name, inputs, seen):
+        if name in seen:
+            return seen[name]
+        func, deps, params = self._stages[name]
+        upstream = {d: self._get(d, inputs, seen) for d in deps}
+        args = {p: inputs[p] for p in params}
+        key = fingerprint([[self._input_key(p, v) for p, v in args.items()],
+                           [k for k, _ in upstream.values()]])
+        cached = self._memo.get(name)
+        if cached is None or cached[0] != key:
+            args = {p: v.value if isinstance(v, Versioned) else v for p, v in args.items()}
+            with timed_stage(name):
+                result = func(**{d: v for d, (_, v) in upstream.items()}, **args)
+            self._memo[name] = cached = (key, result)
+            self.recomputed.append(name)
+        seen[name] = cached
+        return cached
+
+    def _input_key(self, param, value):
+        """Fingerprint of an input, reused while the same object is passed."""
+        seen = self._inputs.get(param)
+        if seen is not None and seen[0] is value:
+            return seen[1]
+        key = fingerprint(value)
+        self._inputs[param] = (value, key)   # holding the object keeps its id unique
+        return key
+
+    def invalidate(self, name=None):
+        """Drop cached results (all stages, or one)."""
+        if name is None:
+            self._memo.clear()
+        else:
+            self._memo.pop(name, None)
+
+
+def allocation_graph():
+    """Graph for the evil-streamlit allocation / phase app."""
+    g = Graph()
+
+    @g.stage('site_data', params=('sites',))
+    def site_data(sites):
+        return pd.DataFrame(sites)
+
+    @g.stage('scores', deps=('site_data',), params=('weights',))
+    def scores(site_data, weights):
+        ndf = site_data.copy()
+        ndf['Feasibility'] = feasibility(ndf, weights)
+        return ndf
+
+    @g.stage('allocation', deps=('scores',), params=('alloc', 'weights'))
+    def allocation(scores, alloc, weights):
+        picked = {s: q for s, q in alloc.items() if q > 0}
+        df_sel = scores[scores['Site'].isin(list(picked))].copy()
+        df_sel['Assigned_tpd'] = df_sel['Site'].map(picked)
+        return composite(df_sel, weights, scores['Tipping_Fee'].max()).reset_index(drop=True)
+
+    @g.stage('phases', deps=('allocation',), params=('durations',))
+    def phases(allocation, durations):
+        out = []
+        for idx, dur in enumerate(durations, 1):
+            cap = allocation['Assigned_tpd'] * 365 * dur
+            rev = cap * allocation['Tipping_Fee']
+            per_yr = rev / dur
+            tbl = pd.DataFrame({
+                'Site': allocation['Site'],
+                f'Phase{idx}_Cap': cap,
+                f'Phase{idx}_Rev': rev,
+                f'P{idx}_Rev_per_yr': per_yr,
+            })
+            out.append((idx, dur, tbl, cap.sum(), rev.sum(), per_yr.sum()))
+        return out
+
+    @g.stage('display', deps=('allocation', 'phases'), params=('display_cols',))
+    def display(allocation, phases, display_cols):
+        df = allocation.copy()
+        for col in ['Tipping_Fee', 'Electric_Power_MW', 'EJ_Rating', 'Composite']:
+            df[col] = df[col].round(2)
+        ints = ['Service_Horizon_(yr)', 'Design_Capacity_tpd', 'Assigned_tpd']
+        df[ints] = df[ints].astype(int)
+        table = df[display_cols].sort_values('Composite', ascending=False)
+        return table, [(idx, dur, tbl.round(2), *totals) for idx, dur, tbl, *totals in phases]
+
+    return g
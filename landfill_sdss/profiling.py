@@ -0,0 +1,267 @@
+"""Stage timing: wall time, CPU time and peak allocations per pipeline stage.
+
+    from landfill_sdss.profiling import timed, stage
+
+    @timed('scores')
+    def compute_scores(...): ...
+
+    with stage('phase tables'):
+        ...
+
+Records go to the current ``Recorder`` (one per Streamlit session / script
+run, see ``recorder()``; it keeps the last ``MAX_RUNS`` runs), can be dumped
+as JSON lines, and are shown by ``performance_panel`` in an optional
+"Performance" expander. Setting
+``SDSS_TIMINGS_LOG=path.jsonl`` also appends every record to that file as a
+structured log.
+
+Peak allocations (tracemalloc) slow a stage down several times, so they are
+only traced when the recorder asks for them (``Recorder.trace_allocs``: the
+apps turn it on while the Performance expander is shown;
+``SDSS_TRACE_ALLOCS=1`` turns it on everywhere). tracemalloc is
+process-wide: a stage whose tracing overlapped a stage on another thread
+(another Streamlit session) is marked ``peak_shared``, since its peak may
+include that thread's allocations.
+
+CPU time is the stage's own thread (``time.thread_time``), since Streamlit
+sessions are threads of one process, plus the CPU of child processes
+reaped meanwhile (subprocess runs). Child CPU is process-wide, so a stage
+that counted some while another thread had a stage open is marked
+``cpu_shared``.
+
+Deep dives: ``SDSS_PROFILE=cprofile`` additionally wraps each stage in
+cProfile and writes ``.sdss_cache/profiles/<run>/<stage>.prof`` (open with
+snakeviz / ``python -m pstats``). For py-spy, run the app under
+``py-spy record -o app.svg -- streamlit run ...``; the stage names appear in
+the flame graph since every stage is a plain function call.
+"""
+import cProfile
+import functools
+import json
+import os
+import re
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+
+from .cache import cache_path
+
+TRACE_ALLOCS = os.environ.get('SDSS_TRACE_ALLOCS', '0') != '0'
+PROFILE_MODE = os.environ.get('SDSS_PROFILE', '')   # '' or 'cprofile'
+TIMINGS_LOG = os.environ.get('SDSS_TIMINGS_LOG')
+MAX_RUNS = 20   # runs a Recorder keeps (it lives in session_state across reruns)
+
+_local = threading.local()
+_trace_lock = threading.Lock()
+_trace_users = {}      # thread id -> open traced stages
+_trace_shared = set()  # threads whose traced stages overlapped another thread's
+_stage_users = {}      # thread id -> open stages (child CPU is process-wide)
+_stage_shared = set()
+
+
+class Recorder:
+    """Collects stage records for one run (a script run or app rerun)."""
+
+    def __init__(self, run_id=None, trace_allocs=TRACE_ALLOCS, max_runs=MAX_RUNS):
+        self.run_id = run_id or uuid.uuid4().hex[:8]
+        self.records = []
+        self.trace_allocs = trace_allocs
+        self.max_runs = max_runs
+
+    def add(self, record):
+        record = {'run': self.run_id, **record}
+        self.records.append(record)
+        if TIMINGS_LOG:
+            with open(TIMINGS_LOG, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+
+    def new_run(self, run_id=None):
+        self.run_id = run_id or uuid.uuid4().hex[:8]
+        runs = list(dict.fromkeys(r['run'] for r in self.records))
+        if len(runs) >= self.max_runs:
+            keep = set(runs[len(runs) - self.max_runs + 1:])
+            self.records = [r for r in self.records if r['run'] in keep]
+
+    def last_run(self):
+        return [r for r in self.records if r['run'] == self.run_id]
+
+    def to_json(self, path=None, records=None):
+        """JSON lines (one per stage, default all kept runs); appended to ``path`` if given."""
+        records = self.records if records is None else records
+        lines = '\n'.join(json.dumps(r) for r in records)
+        if path:
+            with open(path, 'a') as f:
+                f.write(lines + '\n')
+        return lines
+
+    def clear(self):
+        self.records.clear()
+
+
+def recorder():
+    """Recorder for this thread (each Streamlit session runs on its own thread)."""
+    if not hasattr(_local, 'recorder'):
+        _local.recorder = Recorder()
+    return _local.recorder
+
+
+def use_recorder(rec):
+    """Make ``rec`` the current thread's recorder (e.g. from st.session_state)."""
+    _local.recorder = rec
+    return rec
+
+
+def _cpu_time():
+    """(this thread's CPU time, CPU time of reaped child processes)."""
+    t = os.times()
+    return time.thread_time(), t.children_user + t.children_system
+
+
+def _enter(users, shared):
+    """Count an open stage for this thread; flag threads that overlap. Call under _trace_lock."""
+    me = threading.get_ident()
+    others = set(users) - {me}
+    if others:
+        shared.update(others | {me})
+    users[me] = users.get(me, 0) + 1
+
+
+def _leave(users, shared):
+    """Close this thread's stage; True if it overlapped another thread's. Call under _trace_lock."""
+    me = threading.get_ident()
+    was_shared = me in shared
+    users[me] -= 1
+    if not users[me]:
+        del users[me]
+        shared.discard(me)
+    return was_shared
+
+
+def _stack():
+    if not hasattr(_local, 'peaks'):
+        _local.peaks = []
+    return _local.peaks
+
+
+def _start_trace():
+    """Start (or join) tracemalloc; nested stages keep their parent's peak."""
+    with _trace_lock:
+        if not _trace_users:
+            tracemalloc.start()
+        _enter(_trace_users, _trace_shared)
+    peaks = _stack()
+    if peaks:
+        peaks[-1] = max(peaks[-1], tracemalloc.get_traced_memory()[1])
+    tracemalloc.reset_peak()
+    peaks.append(0)
+
+
+def _stop_trace():
+    """(peak bytes, whether another thread traced at the same time)."""
+    peaks = _stack()
+    peak = max(peaks.pop(), tracemalloc.get_traced_memory()[1])
+    if peaks:
+        peaks[-1] = max(peaks[-1], peak)
+    with _trace_lock:
+        shared = _leave(_trace_users, _trace_shared)
+        if not _trace_users:
+            tracemalloc.stop()
+    return peak, shared
+
+
+@contextmanager
+def stage(name, **meta):
+    """Time the enclosed block as pipeline stage ``name``."""
+    rec = recorder()
+    # one cProfile at a time: nested stages show up inside the outer dump
+    prof = None
+    if PROFILE_MODE == 'cprofile' and not getattr(_local, 'profiling', False):
+        prof = cProfile.Profile()
+        _local.profiling = True
+    trace = rec.trace_allocs
+    if trace:
+        _start_trace()
+    with _trace_lock:
+        _enter(_stage_users, _stage_shared)
+    wall0, (cpu0, child0) = time.perf_counter(), _cpu_time()
+    if prof:
+        prof.enable()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        if prof:
+            prof.disable()
+            _local.profiling = False
+        cpu1, child1 = _cpu_time()
+        wall, cpu = time.perf_counter() - wall0, (cpu1 - cpu0) + (child1 - child0)
+        with _trace_lock:
+            cpu_shared = _leave(_stage_users, _stage_shared) and child1 > child0
+        peak, shared = _stop_trace() if trace else (None, False)
+        record = {'stage': name, 'wall_s': round(wall, 6), 'cpu_s': round(cpu, 6),
+                  'peak_mb': None if peak is None else round(peak / 2**20, 3),
+                  'ts': time.time(), **meta}
+        if shared:
+            record['peak_shared'] = True
+        if cpu_shared:
+            record['cpu_shared'] = True
+        if error:
+            record['error'] = error
+        if prof:
+            slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', name)
+            out = cache_path(f"profiles/{rec.run_id}", slug, '.prof')
+            prof.dump_stats(out)
+            record['profile'] = str(out)
+        rec.add(record)
+
+
+def timed(name=None):
+    """Decorator form of ``stage``; defaults to the function's name."""
+    def wrap(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def inner(*args, **kwargs):
+            with stage(label):
+                return func(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def summary(records):
+    """Per-stage totals (wall/CPU summed, peak max) in first-seen order."""
+    out = {}
+    for r in records:
+        s = out.setdefault(r['stage'], {'stage': r['stage'], 'calls': 0, 'wall_s': 0.0,
+                                        'cpu_s': 0.0, 'peak_mb': 0.0})
+        s['calls'] += 1
+        s['wall_s'] += r['wall_s']
+        s['cpu_s'] += r['cpu_s']
+        s['peak_mb'] = max(s['peak_mb'], r['peak_mb'] or 0.0)
+    return list(out.values())
+
+
+def performance_panel(st, rec=None, expanded=False):
+    """Optional "Performance" expander for the Streamlit apps."""
+    rec = rec or recorder()
+    with st.expander("Performance", expanded=expanded):
+        rows = summary(rec.last_run())
+        if not rows:
+            st.caption("No stages recorded in this run.")
+            return
+        st.table([{**r, 'wall_s': round(r['wall_s'], 4), 'cpu_s': round(r['cpu_s'], 4)}
+                  for r in rows])
+        total = sum(r['wall_s'] for r in rows)
+        st.caption(f"Run {rec.run_id}: {total * 1000:,.1f} ms across {len(rows)} stages"
+                   + (" · cProfile dumps in .sdss_cache/profiles/" if PROFILE_MODE == 'cprofile' else ''))
+        if any(r.get('peak_shared') for r in rec.last_run()):
+            st.caption("Some peaks overlap another session's stages and may include its allocations.")
+        if any(r.get('cpu_shared') for r in rec.last_run()):
+            st.caption("Some CPU times include subprocesses another session's stages finished meanwhile.")
+        st.download_button("Download timings (JSON lines)", rec.to_json(records=rec.last_run()),
+                           file_name=f"sdss-timings-{rec.run_id}.jsonl")
@@ -0,0 +1,266 @@
+"""Append-only scenario results store (partitioned Parquet datasets).
+
+``scenario.json`` is overwritten on every run; here each run is appended
+to four Hive-partitioned Parquet datasets under ``results/`` instead:
+
+    runs/       one row per run: flattened parameters + scenario metrics
+    scores/     one row per (run, site): criterion / feasibility scores
+    allocation/ one row per (run, site): assigned t/d and composite
+    phases/     one row per (run, phase): capacity and revenue totals
+
+partitioned by ``run_date=YYYY-MM-DD``. Queries go through
+``pyarrow.dataset`` (``ResultsStore.scan``: filter + column pruning, only
+matching files are read) or DuckDB SQL over the same files
+(``ResultsStore.sql``), so comparing thousands of past runs never loads the
+whole history into memory.
+
+Each run adds one file per table. Once a partition holds ``COMPACT_AT``
+files, the write that reached the threshold merges them into one file, so
+queries open a handful of files rather than one per run. Compaction holds
+the table's lock file exclusively, and readers hold it shared, so a query
+never sees both the per-run files and their merged copy. File schemas are
+cached by (path, size, mtime), so repeat queries don't re-read footers.
+
+    python -m landfill_sdss.results runs --limit 20
+    python -m landfill_sdss.results sql \
+        'SELECT "nonspatial_params.rng_upgrade", avg(voc_ppb) FROM runs GROUP BY 1'
+    python -m landfill_sdss.results compact
+"""
+import argparse
+import fcntl
+import json
+import os
+import time
+import uuid
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from .config import ROOT_DIR
+
+RESULTS_DIR = Path(os.environ.get('SDSS_RESULTS_DIR', ROOT_DIR / 'results'))
+TABLES = ('runs', 'scores', 'allocation', 'phases')
+PARTITIONING = ds.partitioning(pa.schema([('run_date', pa.string())]), flavor='hive')
+COMPACT_AT = 32   # files in a partition before a write merges them
+
+_schemas = {}  # path -> ((size, mtime), Parquet schema), so footers are read once
+
+
+def flatten(params, prefix=''):
+    """Nested scenario dict -> {'spatial_params.expansion_acreage': 30.0, ...}.
+
+    Numbers become floats and lists become JSON text, so a column keeps one
+    type across runs no matter how a widget reported its value; None is left
+    out (reads back as null).
+    """
+    out = {}
+    for key, value in params.items():
+        name = f"{prefix}{key}"
+        if value is None:
+            continue
+        if isinstance(value, dict):
+            out.update(flatten(value, f"{name}."))
+        elif isinstance(value, bool):
+            out[name] = value
+        elif isinstance(value, (int, float)):
+            out[name] = float(value)
+        elif isinstance(value, str):
+            out[name] = value
+        else:
+            out[name] = json.dumps(value)
+    return out
+
+
+class ResultsStore:
+    """Partitioned Parquet datasets of past runs, one directory per table."""
+
+    def __init__(self, root=RESULTS_DIR):
+        self.root = Path(root)
+
+    def path(self, table):
+        return self.root / table
+
+    @contextmanager
+    def _lock(self, table, exclusive=False, blocking=True):
+        """Table lock: shared for reads, exclusive for compaction.
+
+        Yields False when ``blocking`` is off and the lock is taken.
+        """
+        self.path(table).mkdir(parents=True, exist_ok=True)
+        with open(self.path(table) / '.lock', 'a') as f:
+            mode = (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) | (0 if blocking else fcntl.LOCK_NB)
+            try:
+                fcntl.flock(f, mode)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    # --- writing ---
+    def _append(self, table, df, run_id, run_date):
+        if df is None or len(df) == 0:
+            return
+        df = df.copy()
+        df.insert(0, 'run_id', run_id)
+        part = self.path(table) / f"run_date={run_date}"  # hive layout, see PARTITIONING
+        part.mkdir(parents=True, exist_ok=True)
+        # temp name + rename: readers and compaction never see a half-written file
+        out = part / f"{run_id}-0.parquet"
+        tmp = out.with_suffix('.tmp')
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp)
+        os.replace(tmp, out)
+        if sum(1 for _ in part.glob('*.parquet')) >= COMPACT_AT:
+            # another writer or a reader holds the lock: the next write compacts
+            with self._lock(table, exclusive=True, blocking=False) as locked:
+                if locked:
+                    self._compact_partition(part)
+
+    def record(self, params, metrics=None, scores=None, allocation=None, phases=None,
+               kind='scenario', run_id=None):
+        """Append one run; returns its run id.
+
+        ``params``/``metrics`` are (nested) dicts; ``scores``, ``allocation``
+        and ``phases`` are DataFrames (or lists of row dicts).
+        """
+        run_id = run_id or uuid.uuid4().hex[:12]
+        ts = time.time()
+        run_date = datetime.fromtimestamp(ts, timezone.utc).strftime('%Y-%m-%d')
+        row = {'kind': kind, 'ts': ts, 'params_json': json.dumps(params, sort_keys=True),
+               **flatten(params), **flatten(metrics or {})}
+        self._append('runs', pd.DataFrame([row]), run_id, run_date)
+        for table, df in (('scores', scores), ('allocation', allocation), ('phases', phases)):
+            if df is not None and not isinstance(df, pd.DataFrame):
+                df = pd.DataFrame(df)
+            self._append(table, df, run_id, run_date)
+        return run_id
+
+    def compact(self, table=None):
+        """Merge each partition's per-run files into one file (fewer footers to read)."""
+        for t in [table] if table else TABLES:
+            if not self.path(t).exists():
+                continue
+            with self._lock(t, exclusive=True):
+                for part in sorted(self.path(t).glob('run_date=*')):
+                    self._compact_partition(part)
+
+    def _compact_partition(self, part):
+        # caller holds the table lock exclusively
+        files = sorted(part.glob('*.parquet'))
+        if len(files) < 2:
+            return
+        merged = ds.dataset(files, schema=self._schema(files)).to_table()
+        out = part / f"compacted-{uuid.uuid4().hex[:8]}.parquet"
+        tmp = out.with_suffix('.tmp')
+        pq.write_table(merged, tmp)
+        os.replace(tmp, out)
+        for f in files:
+            f.unlink()
+            _schemas.pop(str(f), None)
+
+    # --- reading ---
+    @staticmethod
+    def _schema(files):
+        # runs add parameters over time; missing columns read as null
+        schemas = []
+        for f in files:
+            st = f.stat()
+            stamp = (st.st_size, st.st_mtime_ns)
+            if _schemas.get(str(f), (None,))[0] != stamp:
+                _schemas[str(f)] = (stamp, pq.read_schema(f))
+            schemas.append(_schemas[str(f)][1])
+        return pa.unify_schemas(schemas, promote_options='permissive')
+
+    def dataset(self, table):
+        """``pyarrow.dataset`` over every run of ``table`` (run_date as a column)."""
+        path = self.path(table)
+        files = sorted(path.rglob('*.parquet')) if path.exists() else []
+        if not files:
+            return None
+        schema = self._schema(files)
+        schema = schema.append(pa.field('run_date', pa.string())) \
+            if 'run_date' not in schema.names else schema
+        return ds.dataset([str(f) for f in files], schema=schema, format='parquet',
+                          partitioning=PARTITIONING, partition_base_dir=str(path))
+
+    def scan(self, table, filter=None, columns=None):
+        """Filtered, column-pruned read as a DataFrame.
+
+        ``filter`` is a ``pyarrow.dataset`` expression, e.g.
+        ``(ds.field('kind') == 'scenario') & (ds.field('voc_ppb') < 150)``.
+        """
+        if not self.path(table).exists():
+            return pd.DataFrame(columns=columns or [])
+        with self._lock(table):
+            d = self.dataset(table)
+            if d is None:
+                return pd.DataFrame(columns=columns or [])
+            return d.to_table(filter=filter, columns=columns).to_pandas()
+
+    def recent(self, kind=None, limit=20):
+        """run_id / kind / ts of the latest runs, newest first."""
+        flt = ds.field('kind') == kind if kind else None
+        runs = self.scan('runs', filter=flt, columns=['run_id', 'kind', 'ts'])
+        return runs.sort_values('ts', ascending=False).head(limit).reset_index(drop=True)
+
+    def compare(self, run_ids, columns=None):
+        """Runs side by side: one column per run id, one row per parameter / metric."""
+        if columns is not None:
+            columns = ['run_id', *columns]
+        df = self.scan('runs', filter=ds.field('run_id').isin(list(run_ids)), columns=columns)
+        return df.set_index('run_id').drop(columns=['params_json'], errors='ignore').T
+
+    def sql(self, query):
+        """Run DuckDB SQL with ``runs``/``scores``/``allocation``/``phases`` as views."""
+        import duckdb
+
+        con = duckdb.connect()
+        with ExitStack() as stack:
+            for t in TABLES:
+                if any(self.path(t).rglob('*.parquet')):
+                    stack.enter_context(self._lock(t))
+                    con.execute(f"CREATE VIEW {t} AS SELECT * FROM read_parquet("
+                                f"'{self.path(t).as_posix()}/**/*.parquet', "
+                                f"hive_partitioning = true, union_by_name = true)")
+            return con.execute(query).df()
+
+
+def record_allocation(store, params, scores, allocation, phases):
+    """Record an allocation-app run from its ``scores``/``allocation``/``phases`` stages."""
+    phase_rows = [{'phase': idx, 'duration_yr': dur, 'capacity_t': cap,
+                   'revenue_usd': rev, 'revenue_per_yr_usd': per_yr}
+                  for idx, dur, _, cap, rev, per_yr in phases]
+    metrics = {'total_assigned_tpd': float(allocation['Assigned_tpd'].sum()),
+               'mean_composite': float(allocation['Composite'].mean()) if len(allocation) else None,
+               'total_revenue_usd': float(sum(r['revenue_usd'] for r in phase_rows))}
+    return store.record(params, metrics, scores=scores,
+                        allocation=allocation, phases=phase_rows, kind='allocation')
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    r = sub.add_parser('runs', help='list recent runs')
+    r.add_argument('--limit', type=int, default=20)
+    q = sub.add_parser('sql', help='DuckDB SQL over the result tables')
+    q.add_argument('query')
+    sub.add_parser('compact', help='merge per-run files within each partition')
+    a = ap.parse_args()
+
+    store = ResultsStore()
+    with pd.option_context('display.width', 200, 'display.max_columns', 20):
+        if a.cmd == 'runs':
+            runs = store.scan('runs')
+            print(runs.sort_values('ts', ascending=False).head(a.limit).drop(columns='params_json')
+                  if len(runs) else 'no runs recorded')
+        elif a.cmd == 'sql':
+            print(store.sql(a.query))
+        else:
+            store.compact()
@@ -0,0 +1,330 @@
+"""Long-lived headless model runner with a warm QGIS processing engine.
+
+Starting ``QgsApplication``, initializing Processing and reading
+``landfill-gas-utilization.qgz`` takes seconds; doing it per scenario made
+that the dominant cost of a run. This module keeps a runner process alive
+that does the setup once and then takes scenario jobs over a local TCP
+socket (``127.0.0.1:SDSS_RUNNER_PORT``), one at a time, since QGIS is not
+thread-safe. Each job worker (``landfill_sdss.jobs``) owns its own runner
+on ``PORT + slot``, so the pool runs scenarios side by side; a runner that
+overruns its job's timeout is killed and restarted (``restart_server``)
+through the pid file it writes to ``.sdss_cache/runners/<port>.pid``.
+
+Protocol: the client sends one JSON line ``{"scenario": {...}, "out": dir}``;
+the runner answers with JSON-line events (``{"progress": ..}``,
+``{"stage": .., "wall_s": ..}``) and a final ``{"done": true, "outputs": [..]}``
+or ``{"error": ".."}``. These are the same events ``landfill_sdss.jobs``
+reads from the runner's stdout.
+
+Backends: ``qgis`` (needs the QGIS Python bindings) and ``stub``, a
+pure-Python stand-in computing the same scenario metrics without QGIS, used
+for testing and on machines without QGIS. Until the model's constants are
+final, the metrics written to ``metrics.json`` (and the results store) leave
+``compliant`` / ``issues`` null. ``SDSS_RUNNER_BACKEND`` picks one;
+the default is ``qgis`` when importable, else ``stub``.
+
+    python -m landfill_sdss.runner                    # warm runner
+    python qgis_model_runner.py scenario.json --out results/
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import subprocess
+import sys
+import time
+import traceback
+from contextlib import contextmanager
+from pathlib import Path
+
+from .config import CACHE_DIR, ROOT_DIR
+from .profiling import Recorder, stage, use_recorder
+
+HOST     = '127.0.0.1'
+PORT     = int(os.environ.get('SDSS_RUNNER_PORT', 8766))
+PROJECT  = Path(os.environ.get('SDSS_QGIS_PROJECT', ROOT_DIR / 'landfill-gas-utilization.qgz'))
+MODEL    = os.environ.get('SDSS_QGIS_MODEL')      # e.g. 'project:landfill_scenario'
+START_TIMEOUT_S = 120
+PID_DIR  = CACHE_DIR / 'runners'
+
+# --- Scenario model constants (placeholders until the QGIS model is final) ---
+SQFT_PER_ACRE      = 43_560
+TONS_PER_CY        = 0.6        # compacted MSW, ~1 200 lb / cubic yard
+LFG_CF_PER_TON_YR  = 100        # landfill gas generated per ton in place per year
+METHANE_FRACTION   = 0.5
+BTU_PER_CF_CH4     = 1_012
+BTU_PER_MWH        = 3.412e6
+RNG_CAPTURE        = 0.9        # share of gas sent to RNG upgrading instead of turbines
+BASE_VOC_PPB       = 180
+BUFFER_VOC_FACTOR  = 0.8        # riparian buffer
+RNG_VOC_FACTOR     = 0.85
+
+
+@contextmanager
+def step(emit, name):
+    """Time ``name`` and report it to the client as a stage event."""
+    rec = use_recorder(Recorder())
+    with stage(name):
+        yield
+    r = rec.records[-1]
+    emit({k: r[k] for k in ('stage', 'wall_s', 'cpu_s', 'peak_mb')})
+
+
+def scenario_metrics(scenario):
+    """Capacity, gas/energy and compliance figures for one scenario.
+
+    ``compliant`` is None when an active constraint can't be checked from the
+    scenario (listed in ``unchecked``), e.g. the post-expansion height limit
+    without ``spatial_params.existing_height_ft``.
+    """
+    sp = scenario.get('spatial_params', {})
+    ns = scenario.get('nonspatial_params', {})
+    drivers = scenario.get('external_drivers', {})
+
+    airspace_cy = sp.get('expansion_acreage', 0) * SQFT_PER_ACRE * sp.get('height_increase_ft', 0) / 27
+    capacity_t = airspace_cy * TONS_PER_CY
+    fill_tpy = ns.get('fill_rate_tpd', 0) * 365
+    life_yr = capacity_t / fill_tpy if fill_tpy else None
+
+    gas_cf = capacity_t * LFG_CF_PER_TON_YR
+    ch4_btu = gas_cf * METHANE_FRACTION * BTU_PER_CF_CH4
+    to_rng = RNG_CAPTURE if ns.get('rng_upgrade') else 0.0
+    mwh = ch4_btu * (1 - to_rng) * ns.get('turbine_efficiency_pct', 0) / 100 / BTU_PER_MWH
+    rng_mmbtu = ch4_btu * to_rng / 1e6
+
+    voc = BASE_VOC_PPB
+    if sp.get('buffer_installed'):
+        voc *= BUFFER_VOC_FACTOR
+    if ns.get('rng_upgrade'):
+        voc *= RNG_VOC_FACTOR
+
+    issues, unchecked = [], []
+    policy = drivers.get('policy_pressure', {})
+    if policy.get('active'):
+        max_voc = policy.get('constraints', {}).get('max_voc_ppb', 150)
+        if voc > max_voc:
+            issues.append(f"VOC {voc:.0f} ppb exceeds {max_voc} ppb")
+    legal = drivers.get('legal_constraint_active', {})
+    if legal.get('active'):
+        max_height = legal.get('constraints', {}).get('max_landfill_height_ft')
+        # the limit is on the height after expansion, not on the increase
+        if max_height is not None:
+            if sp.get('existing_height_ft') is None:
+                unchecked.append('max_landfill_height_ft')
+            else:
+                height = sp['existing_height_ft'] + sp.get('height_increase_ft', 0)
+                if height > max_height:
+                    issues.append(f"post-expansion height {height:.0f} ft exceeds {max_height} ft")
+
+    return {
+        'added_airspace_cy': airspace_cy,
+        'added_capacity_tons': capacity_t,
+        'service_life_yr': life_yr,
+        'electricity_mwh_per_yr': mwh,
+        'rng_mmbtu_per_yr': rng_mmbtu,
+        'voc_ppb': voc,
+        'compliant': False if issues else (None if unchecked else True),
+        'issues': issues,
+        'unchecked': unchecked,
+    }
+
+
+class StubBackend:
+    """Pure-Python stand-in: same events and outputs, no QGIS."""
+    name = 'stub'
+
+    def run(self, scenario, out_dir, emit):
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        emit({'progress': 0.1, 'message': 'computing scenario metrics'})
+        with step(emit, 'metrics'):
+            metrics = scenario_metrics(scenario)
+        # placeholder model constants: don't record a compliance verdict from them
+        metrics.update(compliant=None, issues=None, unchecked=None)
+        emit({'progress': 0.9, 'message': 'writing outputs'})
+        with step(emit, 'write outputs'):
+            path = out_dir / 'metrics.json'
+            path.write_text(json.dumps({'backend': self.name, **metrics}, indent=2))
+        return [str(path)]
+
+
+class QgisBackend(StubBackend):
+    """Headless QGIS with Processing and the project loaded once."""
+    name = 'qgis'
+
+    def __init__(self, project=PROJECT):
+        from qgis.core import QgsApplication, QgsProject
+
+        QgsApplication.setPrefixPath(os.environ.get('QGIS_PREFIX_PATH', '/usr'), True)
+        self.app = QgsApplication([], False)
+        self.app.initQgis()
+        from processing.core.Processing import Processing
+        Processing.initialize()
+        import processing
+        self.processing = processing
+        self.project = QgsProject.instance()
+        if not self.project.read(str(project)):
+            raise RuntimeError(f"could not read QGIS project {project}")
+
+    def run(self, scenario, out_dir, emit):
+        outputs = []
+        if MODEL:
+            from qgis.core import QgsProcessingFeedback
+
+            class Feedback(QgsProcessingFeedback):
+                def setProgress(self, pct):
+                    super().setProgress(pct)
+                    emit({'progress': 0.8 * pct / 100, 'message': 'running model'})
+
+            params = {**scenario.get('spatial_params', {}), **scenario.get('nonspatial_params', {}),
+                      'OUTPUT_FOLDER': str(out_dir)}
+            with step(emit, MODEL):
+                result = self.processing.run(MODEL, params, feedback=Feedback())
+            outputs += [str(v) for v in result.values() if isinstance(v, str) and os.path.exists(v)]
+        return outputs + super().run(scenario, out_dir, emit)
+
+
+def make_backend(name=None):
+    name = name or os.environ.get('SDSS_RUNNER_BACKEND')
+    if name == 'stub':
+        return StubBackend()
+    try:
+        return QgisBackend()
+    except ImportError:
+        if name == 'qgis':
+            raise
+        return StubBackend()
+
+
+def run_once(backend, scenario, out_dir, emit):
+    """One scenario through ``backend``; always ends with a done/error event."""
+    try:
+        outputs = backend.run(scenario, out_dir, emit)
+    except Exception as e:
+        emit({'error': f"{type(e).__name__}: {e}", 'traceback': traceback.format_exc()})
+        return False
+    emit({'done': True, 'outputs': outputs})
+    return True
+
+
+# --- Server ---
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        def emit(event):
+            self.wfile.write((json.dumps(event) + '\n').encode())
+            self.wfile.flush()
+        try:
+            req = json.loads(self.rfile.readline())
+        except ValueError as e:
+            emit({'error': f"bad request: {e}"})
+            return
+        if req.get('ping'):
+            emit({'pong': True, 'backend': self.server.backend.name})
+            return
+        run_once(self.server.backend, req['scenario'], req['out'], emit)
+
+
+class RunnerServer(socketserver.TCPServer):
+    """Serial (one job at a time) server around a warm backend."""
+    allow_reuse_address = True
+    request_queue_size = 64
+
+    def __init__(self, backend, port=PORT):
+        self.backend = backend
+        super().__init__((HOST, port), _Handler)
+
+
+def pid_file(port=PORT):
+    return PID_DIR / f"{port}.pid"
+
+
+def serve(backend=None, port=PORT):
+    backend = backend or make_backend()
+    with RunnerServer(backend, port) as server:
+        PID_DIR.mkdir(parents=True, exist_ok=True)
+        pid_file(port).write_text(str(os.getpid()))
+        print(f"runner ({backend.name}) listening on {HOST}:{port}", file=sys.stderr, flush=True)
+        try:
+            server.serve_forever()
+        finally:
+            pid_file(port).unlink(missing_ok=True)
+
+
+# --- Client ---
+def _connect(port=PORT, timeout=None):
+    return socket.create_connection((HOST, port), timeout=timeout)
+
+
+def ensure_server(port=PORT, timeout=START_TIMEOUT_S):
+    """Start a detached runner if none is listening; True once one answers."""
+    try:
+        _connect(port, timeout=1).close()
+        return True
+    except OSError:
+        pass
+    subprocess.Popen([sys.executable, '-m', 'landfill_sdss.runner', '--port', str(port)],
+                     cwd=ROOT_DIR, start_new_session=True,
+                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            _connect(port, timeout=1).close()
+            return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def kill_server(port=PORT):
+    """Kill the runner on ``port`` (and anything it started), busy or not."""
+    path = pid_file(port)
+    try:
+        pid = int(path.read_text())
+    except (OSError, ValueError):
+        return False
+    try:
+        # detached runners lead their own session: take the model's children too
+        if os.getpgid(pid) == pid:
+            os.killpg(pid, signal.SIGKILL)
+        else:
+            os.kill(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    path.unlink(missing_ok=True)
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        try:
+            _connect(port, timeout=1).close()
+            time.sleep(0.1)
+        except OSError:
+            break
+    return True
+
+
+def restart_server(port=PORT):
+    """Replace a stuck runner with a fresh warm one."""
+    kill_server(port)
+    return ensure_server(port)
+
+
+def submit(scenario, out_dir, emit, port=PORT):
+    """Run ``scenario`` on the warm runner, forwarding its events to ``emit``."""
+    with _connect(port) as sock:
+        sock.sendall((json.dumps({'scenario': scenario, 'out': str(out_dir)}) + '\n').encode())
+        for line in sock.makefile('r'):
+            event = json.loads(line)
+            emit(event)
+            if 'done' in event or 'error' in event:
+                return 'done' in event
+    emit({'error': 'runner closed the connection'})
+    return False
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--port', type=int, default=PORT)
+    ap.add_argument('--backend', choices=['qgis', 'stub'])
+    a = ap.parse_args()
+    serve(make_backend(a.backend), a.port)
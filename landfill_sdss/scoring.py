@@ -0,0 +1,48 @@
+"""Feasibility / composite scoring shared by the allocation apps.
+
+Same formulas as the evil-streamlit apps: every criterion is mapped to
+[0,1] with 1 = better, then combined with user weights normalized to sum 1.
+"""
+DEFAULT_WEIGHTS = {'cost': 0.3, 'capacity': 0.3, 'risk': 0.2, 'ej': 0.2}
+
+# columns every site row needs before it can be scored
+SITE_COLUMNS = [
+    'Site', 'Tipping_Fee', 'Project_Name', 'Design_Capacity_tpd',
+    'Service_Horizon_(yr)', 'Electric_Power_MW', 'Hydrological_Risk',
+    'EJ_Rating', 'Dist_to_rail_mi', 'Dist_to_hwy_mi',
+]
+
+
+def normalize_weights(weights):
+    """Scale weights so they sum to 1 (all-zero -> equal weights)."""
+    total = sum(weights.values())
+    if total == 0:
+        return {k: 1 / len(weights) for k in weights}
+    return {k: w / total for k, w in weights.items()}
+
+
+def feasibility(ndf, weights, max_fee=None):
+    """Static feasibility per site (capacity assumed fully available)."""
+    w = normalize_weights(weights)
+    max_fee = ndf['Tipping_Fee'].max() if max_fee is None else max_fee
+    return (
+        (1 - ndf['Tipping_Fee'] / max_fee) * w['cost']
+        + 1.0 * w['capacity']
+        + (1 - ndf['Hydrological_Risk']) * w['risk']
+        + (1 - ndf['EJ_Rating']) * w['ej']
+    )
+
+
+def composite(df_sel, weights, max_fee):
+    """Add per-criterion scores and the weighted Composite to ``df_sel``."""
+    w = normalize_weights(weights)
+    df_sel = df_sel.copy()
+    df_sel['Cost_score']     = 1 - df_sel['Tipping_Fee'] / max_fee
+    df_sel['Capacity_score'] = df_sel['Assigned_tpd'] / df_sel['Design_Capacity_tpd']
+    df_sel['Risk_score']     = 1 - df_sel['Hydrological_Risk']
+    df_sel['EJ_score']       = 1 - df_sel['EJ_Rating']
+    df_sel['Composite']      = (
+        w['cost'] * df_sel['Cost_score'] + w['capacity'] * df_sel['Capacity_score']
+        + w['risk'] * df_sel['Risk_score'] + w['ej'] * df_sel['EJ_score']
+    )
+    return df_sel
@@ -0,0 +1,81 @@
+"""Cold-start import report and startup budget for the app modules.
+
+Each check imports modules in a fresh interpreter under ``-X importtime``
+and reports the import time spent in each top-level package, whether any
+of the heavy geospatial packages (``lazy.HEAVY``) got pulled in, and the
+total against the budget:
+
+    python -m landfill_sdss.startup                  # allocation app modules
+    python -m landfill_sdss.startup --budget 0.5 landfill_sdss.pipeline
+    python -m landfill_sdss.startup --top 20
+
+Exit status 1 when the budget is exceeded or a heavy package was imported,
+so the check can run in CI.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+from .config import ROOT_DIR
+from .lazy import HEAVY
+
+# what the allocation / scenario apps import before their first render
+APP_MODULES = (
+    'landfill_sdss.pipeline', 'landfill_sdss.profiling', 'landfill_sdss.maps',
+    'landfill_sdss.thumbnails', 'landfill_sdss.jobs',
+)
+BUDGET_S = float(os.environ.get('SDSS_STARTUP_BUDGET', 1.0))   # seconds, whole list
+
+_LINE = re.compile(r'import time:\s+(\d+) \|\s+\d+ \|\s*(\S+)')
+
+
+def import_times(modules):
+    """{top-level package: µs spent importing its modules} for ``modules``."""
+    code = 'import ' + ', '.join(modules)
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          capture_output=True, text=True, cwd=ROOT_DIR)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    times = {}
+    for m in _LINE.finditer(proc.stderr):
+        self_us, name = m.groups()
+        pkg = name.split('.')[0]
+        times[pkg] = times.get(pkg, 0) + int(self_us)
+    return times
+
+
+def loaded_packages(modules):
+    """Top-level packages in ``sys.modules`` after importing ``modules``."""
+    code = (f"import sys, {', '.join(modules)}; "
+            "print(' '.join(sorted({m.split('.')[0] for m in sys.modules})))")
+    proc = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, cwd=ROOT_DIR)
+    return proc.stdout.split()
+
+
+def report(modules=APP_MODULES, budget=BUDGET_S, top=10):
+    """(ok, lines): the import-time report for ``modules``."""
+    times = import_times(modules)
+    total = sum(times.values()) / 1e6
+    heavy = sorted(set(loaded_packages(modules)) & set(HEAVY))
+
+    lines = [f"{'package':<40} {'ms':>9}"]
+    for name, us in sorted(times.items(), key=lambda kv: -kv[1])[:top]:
+        lines.append(f"{name:<40} {us / 1000:9.1f}")
+    lines.append(f"total {total:.3f} s, budget {budget:.3f} s")
+    if heavy:
+        lines.append(f"heavy packages imported at startup: {', '.join(heavy)}")
+    return total <= budget and not heavy, lines
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('modules', nargs='*', help=f"modules to import (default: {' '.join(APP_MODULES)})")
+    ap.add_argument('--budget', type=float, default=BUDGET_S, help='seconds')
+    ap.add_argument('--top', type=int, default=10, help='packages listed')
+    a = ap.parse_args()
+
+    ok, lines = report(a.modules or APP_MODULES, a.budget, a.top)
+    print('\n'.join(lines))
+    sys.exit(0 if ok else 1)
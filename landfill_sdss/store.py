@@ -0,0 +1,162 @@
+"""Spatial store for candidates, buffers and criterion scores.
+
+``Candidates_raw.sql`` is an ogr2ogr dump: row-by-row INSERTs, the tipping
+fee as VARCHAR and dates as strings. Here the same data is cleaned into
+proper types and bulk-loaded with a spatial index into
+
+* PostGIS, when ``SDSS_DATABASE_URL`` (or ``url``) is a postgresql:// URL
+  and SQLAlchemy is installed (COPY-based ``to_postgis`` + GIST index), or
+* a local GeoPackage (``.sdss_cache/sdss.gpkg``, R-tree index) otherwise.
+
+``SpatialStore.query`` pushes bbox and attribute filters into the database
+so callers never load a whole layer into pandas just to filter it.
+
+    python -m landfill_sdss.store            # (re)load the default tables
+"""
+import os
+
+import pandas as pd
+
+from .config import BUFFER_FT, CACHE_DIR, TARGET_CRS
+from .layers import load_layer
+from .lazy import lazy_import
+
+gpd = lazy_import('geopandas')
+pyogrio = lazy_import('pyogrio')
+
+# Candidates.csv header -> typed column name
+CANDIDATE_COLUMNS = {
+    'Facility Name': 'facility_name',
+    '2020 Waste Quantity (tons)': 'waste_2020_tons',
+    'Existing Annual Permit Limits (tons/year)': 'permit_limit_tpy',
+    'Estimated Spare Capacity (Yearly)': 'spare_capacity_tpy',
+    'ΔCapacity (t/d)': 'delta_capacity_tpd',
+    'NYC Design / ΔCapacity (t/d)': 'nyc_design_tpd',
+    'Existing & Planned Capacity Under Permit (tons)': 'permitted_capacity_tons',
+    'Out-of-County Tipping Fee ($/ton)': 'tipping_fee_usd',
+    'Active Footprint  (+ Expansion), Acres': 'footprint_acres',
+    'Service Horizon (yrs)': 'service_horizon_yr',
+    'Gas Recovered for Energy (cubic feet)': 'gas_recovered_cf',
+    'Electricity Generated (megawatt-hrs)': 'electricity_mwh',
+    'Waste Types (MSW & Other)': 'waste_types',
+    'Permit No.': 'permit_no',
+    'Permit Expiration Date': 'permit_expires',
+    'Authorization-Issue Date': 'authorization_issued',
+    'Current Annual Report': 'annual_report_url',
+    'owner': 'owner',
+    'County': 'county',
+}
+DATE_COLUMNS = ('permit_expires', 'authorization_issued')
+
+
+def typed_candidates():
+    """Candidates in EPSG:2260 with numeric fees and real dates."""
+    gdf = load_layer('candidates')
+    gdf = gdf[[*CANDIDATE_COLUMNS, 'geometry']].rename(columns=CANDIDATE_COLUMNS)
+    gdf['tipping_fee_usd'] = pd.to_numeric(
+        gdf['tipping_fee_usd'].str.replace(r'[$,]', '', regex=True), errors='coerce')
+    for col in DATE_COLUMNS:
+        gdf[col] = pd.to_datetime(gdf[col], format='%m/%d/%Y', errors='coerce')
+    # permit numbers are identifiers; the CSV float rendering is not
+    gdf['permit_no'] = gdf['permit_no'].map(lambda v: None if pd.isna(v) else f"{v:.0f}")
+    return gdf
+
+
+def candidate_buffers(candidates=None, distance=BUFFER_FT):
+    candidates = typed_candidates() if candidates is None else candidates
+    return gpd.GeoDataFrame(
+        {'facility_name': candidates['facility_name'], 'buffer_ft': distance},
+        geometry=candidates.geometry.buffer(distance), crs=candidates.crs)
+
+
+class SpatialStore:
+    """GeoPackage or PostGIS store with bulk load and filtered reads."""
+
+    def __init__(self, url=None):
+        url = url or os.environ.get('SDSS_DATABASE_URL')
+        self.engine = None
+        if url and url.startswith('postgresql'):
+            from sqlalchemy import create_engine
+            self.engine = create_engine(url)
+            self.path = None
+        else:
+            self.path = url or str(CACHE_DIR / 'sdss.gpkg')
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+    @property
+    def is_postgis(self):
+        return self.engine is not None
+
+    def bulk_load(self, name, df):
+        """Replace table ``name`` with ``df`` in one bulk write.
+
+        GeoDataFrames get a spatial index; plain DataFrames become
+        attribute-only tables (e.g. criterion scores keyed by site).
+        """
+        spatial = isinstance(df, gpd.GeoDataFrame)
+        if spatial:
+            df = df.to_crs(TARGET_CRS)
+        if self.is_postgis:
+            from sqlalchemy import text
+            if spatial:
+                df.to_postgis(name, self.engine, if_exists='replace', index=False, chunksize=10_000)
+                with self.engine.begin() as con:
+                    con.execute(text(f'CREATE INDEX IF NOT EXISTS "{name}_geom_idx" '
+                                     f'ON "{name}" USING GIST (geometry)'))
+                    con.execute(text(f'ANALYZE "{name}"'))
+            else:
+                df.to_sql(name, self.engine, if_exists='replace', index=False,
+                          method='multi', chunksize=10_000)
+        else:
+            pyogrio.write_dataframe(df, self.path, layer=name, driver='GPKG',
+                                    use_arrow=True, layer_options={'OVERWRITE': 'YES'},
+                                    **({'SPATIAL_INDEX': 'YES'} if spatial else {}))
+        return len(df)
+
+    def query(self, name, bbox=None, where=None, columns=None):
+        """Rows of ``name`` intersecting ``bbox`` (EPSG:2260) matching ``where``.
+
+        ``where`` is an SQL boolean expression on the table's columns, e.g.
+        ``"tipping_fee_usd < 70 AND county = 'Seneca'"``.
+        """
+        if self.is_postgis:
+            cols = ', '.join(f'"{c}"' for c in columns) + ', geometry' if columns else '*'
+            clauses, params = [], {}
+            if bbox is not None:
+                clauses.append('geometry && ST_MakeEnvelope(%(x0)s, %(y0)s, %(x1)s, %(y1)s, 2260)')
+                params = dict(zip(('x0', 'y0', 'x1', 'y1'), map(float, bbox)))
+            if where:
+                clauses.append(f'({where})')
+            sql = f'SELECT {cols} FROM "{name}"'
+            if clauses:
+                sql += ' WHERE ' + ' AND '.join(clauses)
+            return gpd.read_postgis(sql, self.engine, geom_col='geometry', params=params)
+        return pyogrio.read_dataframe(self.path, layer=name, bbox=bbox, where=where,
+                                      columns=columns, use_arrow=True)
+
+    def tables(self):
+        if self.is_postgis:
+            from sqlalchemy import inspect
+            return inspect(self.engine).get_table_names()
+        if not os.path.exists(self.path):
+            return []
+        return [n for n, _ in pyogrio.list_layers(self.path)]
+
+
+def load_defaults(store=None, scores=None):
+    """Bulk-load candidates, their buffers and (optionally) criterion scores."""
+    store = store or SpatialStore()
+    cands = typed_candidates()
+    counts = {
+        'candidates': store.bulk_load('candidates', cands),
+        'candidate_buffers': store.bulk_load('candidate_buffers', candidate_buffers(cands)),
+    }
+    if scores is not None:
+        counts['criterion_scores'] = store.bulk_load('criterion_scores', scores)
+    return counts
+
+
+if __name__ == '__main__':
+    s = SpatialStore()
+    for table, n in load_defaults(s).items():
+        print(f"{table}: {n} rows -> {'PostGIS' if s.is_postgis else s.path}")
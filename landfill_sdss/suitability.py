@@ -0,0 +1,237 @@
+"""Suitability surface and automated candidate-site extraction.
+
+The study area is cut into square tiles; a process pool scores each tile
+independently (hazard presence, DAC rank, distance to the rail network) and
+writes into one float32 grid per criterion. Cells outside the study-area
+boundary (``config.STUDY_AREA``: open water, neighbouring states inside the
+bounding box) are NaN, since an absent hazard / DAC polygon there would
+otherwise score as ideal. The weighted surface is then thresholded,
+contiguous high-scoring cells are labelled, and the best N regions are
+polygonized into site rows that ``scoring.feasibility`` accepts.
+
+    python -m landfill_sdss.suitability --hazard fema_floodplain.shp --top 5
+    python -m landfill_sdss.suitability --study-area nys_counties.shp --top 5
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .config import TARGET_CRS
+from .layers import REGISTRY, load_layer
+from .lazy import lazy_import
+from .scoring import SITE_COLUMNS
+
+gpd = lazy_import('geopandas')
+features = lazy_import('rasterio.features')
+rio_transform = lazy_import('rasterio.transform')
+ndimage = lazy_import('scipy.ndimage')
+spatial = lazy_import('scipy.spatial')
+shapely_geometry = lazy_import('shapely.geometry')
+shapely_ops = lazy_import('shapely.ops')
+
+CELL_FT  = 500
+TILE     = 512                      # cells per tile side
+FT_PER_MI = 5280
+SQFT_PER_ACRE = 43560
+TPD_PER_ACRE  = 15                  # ≈ Seneca Meadows: 6 000 t/d over 400 acres
+# Checked on the real DAC / hubs layers over NYS (5 000 ft cells): DAC tracts
+# are ~9 % of the land, so the EJ term mostly excludes them (0.4 % of the
+# top 5 % falls inside one) and rail access (median 13 mi) ranks the rest.
+# Without hazard layers the hydro term is constant and is dropped below.
+WEIGHTS  = {'hydro': 0.4, 'ej': 0.3, 'network': 0.3}
+
+# defaults used for fields the surface can't tell us (same as Sites H/I)
+NEW_SITE_DEFAULTS = {'Tipping_Fee': 85, 'Service_Horizon_(yr)': 30, 'Electric_Power_MW': 0}
+
+# per-worker state, filled once by _init_worker
+_W = {}
+
+
+def _network_points(names):
+    pts = [load_layer(n).geometry.get_coordinates().to_numpy() for n in names]
+    return np.vstack(pts) if pts else np.empty((0, 2))
+
+
+def _init_worker(hazards, rail, ej_layer, ej_field, study_area):
+    _W.update(hazards=hazards, ej_layer=ej_layer, ej_field=ej_field, study_area=study_area)
+    pts = _network_points(rail)
+    _W['rail'] = spatial.cKDTree(pts) if len(pts) else None
+
+
+def _burn(layer, shape_, transform, bbox, value_field=None):
+    gdf = load_layer(layer, columns=[value_field] if value_field else [], bbox=bbox)
+    if gdf.empty:
+        return np.zeros(shape_, dtype='float32')
+    vals = gdf[value_field] if value_field else [1] * len(gdf)
+    return features.rasterize(zip(gdf.geometry, vals), out_shape=shape_,
+                              transform=transform, fill=0, dtype='float32')
+
+
+def _score_tile(args):
+    """Criterion grids for one tile: (row0, col0, inside, hazard, ej, rail_mi)."""
+    row0, col0, h, w, x0, y0, cell = args
+    transform = rio_transform.from_origin(x0, y0, cell, cell)
+    bbox = (x0, y0 - h * cell, x0 + w * cell, y0)
+    inside = _burn(_W['study_area'], (h, w), transform, bbox) > 0
+
+    hazard = np.zeros((h, w), dtype='float32')
+    for layer in _W['hazards']:
+        hazard += _burn(layer, (h, w), transform, bbox)
+    if _W['hazards']:
+        hazard /= len(_W['hazards'])  # share of hazard layers present
+
+    ej = np.zeros((h, w), dtype='float32')
+    if _W['ej_layer']:
+        ej = _burn(_W['ej_layer'], (h, w), transform, bbox, _W['ej_field']) / 100
+
+    rail = np.full((h, w), np.nan, dtype='float32')
+    if _W['rail'] is not None:
+        xs = x0 + (np.arange(w) + 0.5) * cell
+        ys = y0 - (np.arange(h) + 0.5) * cell
+        xx, yy = np.meshgrid(xs, ys)
+        d, _ = _W['rail'].query(np.column_stack([xx.ravel(), yy.ravel()]))
+        rail = (d / FT_PER_MI).reshape(h, w).astype('float32')
+    return row0, col0, inside, hazard, ej, rail
+
+
+def _require(layer):
+    try:
+        REGISTRY.cached_path(layer)
+    except FileNotFoundError as e:
+        raise FileNotFoundError(
+            f"study-area boundary not found: {e.filename}; pass study_area / --study-area "
+            f"(e.g. NYS state or county polygons) or set SDSS_STUDY_AREA") from None
+
+
+def suitability_surface(bounds, hazards=(), rail=('hubs',), ej_layer='dac',
+                        ej_field='Rank_State', weights=None, study_area='study_area',
+                        cell=CELL_FT, tile=TILE, workers=None):
+    """Weighted suitability grid over ``bounds`` (EPSG:2260 feet).
+
+    ``hazards``: layer names/paths; a cell's hydro hazard is the share of
+    these layers covering it. ``ej_field`` is a 0–100 DAC rank. Network
+    access is 1 / (miles to nearest ``rail`` vertex + 1), as in the EJ
+    proximity metric. Cells outside the ``study_area`` polygons are NaN in
+    every grid. Without ``hazards`` the hydro weight is shared out over the
+    other two. Returns a dict of float32 grids plus ``transform``.
+    """
+    _require(study_area)
+    weights = weights or WEIGHTS
+    if not hazards:
+        # no hazard layers: hydro would only add a constant to every cell
+        rest = weights['ej'] + weights['network']
+        weights = {'hydro': 0.0, 'ej': weights['ej'] / rest, 'network': weights['network'] / rest}
+    minx, miny, maxx, maxy = bounds
+    ncols = int(np.ceil((maxx - minx) / cell))
+    nrows = int(np.ceil((maxy - miny) / cell))
+    grids = {k: np.zeros((nrows, ncols), dtype='float32') for k in ('hazard', 'ej', 'rail_mi')}
+    inside = np.zeros((nrows, ncols), dtype=bool)
+
+    jobs = [
+        (r, c, min(tile, nrows - r), min(tile, ncols - c), minx + c * cell, maxy - r * cell, cell)
+        for r in range(0, nrows, tile) for c in range(0, ncols, tile)
+    ]
+    # build the cached layer copies once, before the workers read them
+    for name in (study_area, *hazards, *rail, *([ej_layer] if ej_layer else [])):
+        REGISTRY.ensure(name)
+    init = (list(hazards), list(rail), ej_layer, ej_field, study_area)
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                             initializer=_init_worker, initargs=init) as pool:
+        for r, c, ins, hz, ej, rm in pool.map(_score_tile, jobs):
+            h, w = hz.shape
+            inside[r:r + h, c:c + w]           = ins
+            grids['hazard'][r:r + h, c:c + w]  = hz
+            grids['ej'][r:r + h, c:c + w]      = ej
+            grids['rail_mi'][r:r + h, c:c + w] = rm
+    for k in ('hazard', 'ej', 'rail_mi'):
+        grids[k][~inside] = np.nan
+
+    access = 1 / (np.nan_to_num(grids['rail_mi'], nan=np.inf) + 1)
+    grids['score'] = (
+        weights['hydro'] * (1 - grids['hazard'])
+        + weights['ej'] * (1 - grids['ej'])
+        + weights['network'] * access
+    ).astype('float32')
+    grids['transform'] = rio_transform.from_origin(minx, maxy, cell, cell)
+    return grids
+
+
+def extract_candidates(grids, top=5, quantile=0.95, min_acres=50, max_acres=2000,
+                       prefix='Suitability Site'):
+    """Top-``top`` contiguous regions above the ``quantile`` score.
+
+    Regions are ranked by mean score; each becomes one polygon row carrying
+    the scoring columns (hazard/EJ means, rail distance, capacity from area).
+    Regions outside [``min_acres``, ``max_acres``] are not parcel-sized and
+    are skipped.
+    """
+    score, transform = grids['score'], grids['transform']
+    cell_acres = abs(transform.a * transform.e) / SQFT_PER_ACRE
+    mask = score >= np.nanquantile(score, quantile)
+    labels, n = ndimage.label(mask)
+    if n == 0:
+        return gpd.GeoDataFrame(columns=[*SITE_COLUMNS, 'geometry'], crs=TARGET_CRS)
+
+    idx = np.arange(1, n + 1)
+    size = ndimage.sum(mask, labels, idx)
+    acres = size * cell_acres
+    keep = idx[(acres >= min_acres) & (acres <= max_acres)]
+    if len(keep) == 0:
+        return gpd.GeoDataFrame(columns=[*SITE_COLUMNS, 'geometry'], crs=TARGET_CRS)
+    means = {k: ndimage.mean(grids[k], labels, keep) for k in ('score', 'hazard', 'ej', 'rail_mi')}
+    order = np.argsort(-means['score'])[:top]
+
+    rows = []
+    for rank, i in enumerate(order, 1):
+        lab = keep[i]
+        region = (labels == lab).astype('uint8')
+        geom = shapely_ops.unary_union([
+            shapely_geometry.shape(g)
+            for g, v in features.shapes(region, mask=region.astype(bool), transform=transform) if v
+        ])
+        acres = geom.area / SQFT_PER_ACRE
+        rows.append({
+            **NEW_SITE_DEFAULTS,
+            'Site': f"{prefix} {rank}",
+            'Project_Name': f"Suitability candidate #{rank} ({acres:,.0f} ac)",
+            'Design_Capacity_tpd': int(acres * TPD_PER_ACRE),
+            'Hydrological_Risk': round(float(means['hazard'][i]), 3),
+            'EJ_Rating': round(float(means['ej'][i]), 3),
+            'Dist_to_rail_mi': round(float(means['rail_mi'][i]), 2),
+            'Dist_to_hwy_mi': None,
+            'Suitability': round(float(means['score'][i]), 3),
+            'geometry': geom,
+        })
+    cols = [*SITE_COLUMNS, 'Suitability', 'geometry']
+    return gpd.GeoDataFrame(rows, crs=TARGET_CRS)[cols]
+
+
+def candidate_sites(bounds=None, top=5, **kwargs):
+    """Surface + extraction in one call; ``bounds`` defaults to the study-area extent."""
+    if bounds is None:
+        study_area = kwargs.get('study_area', 'study_area')
+        _require(study_area)
+        bounds = tuple(load_layer(study_area, columns=[]).total_bounds)
+    extract_kw = {k: kwargs.pop(k) for k in ('quantile', 'min_acres', 'max_acres') if k in kwargs}
+    return extract_candidates(suitability_surface(bounds, **kwargs), top=top, **extract_kw)
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--hazard', action='append', default=[], help='hazard layer (repeatable)')
+    ap.add_argument('--bounds', type=float, nargs=4, metavar=('MINX', 'MINY', 'MAXX', 'MAXY'))
+    ap.add_argument('--study-area', default='study_area',
+                    help='land boundary polygons (default: config.STUDY_AREA)')
+    ap.add_argument('--top', type=int, default=5)
+    ap.add_argument('--cell', type=float, default=CELL_FT)
+    ap.add_argument('--workers', type=int)
+    ap.add_argument('--out', help='write candidates to this GeoPackage')
+    a = ap.parse_args()
+
+    sites = candidate_sites(a.bounds, top=a.top, hazards=a.hazard, study_area=a.study_area,
+                            cell=a.cell, workers=a.workers)
+    print(sites.drop(columns='geometry'))
+    if a.out:
+        sites.to_file(a.out, driver='GPKG')
@@ -0,0 +1,153 @@
+"""Pre-rendered Hydro-Risk / EJ map thumbnails for every candidate site.
+
+Rendering is done offline, one site per worker process, into
+``.sdss_cache/thumbnails/<kind>-<site>-<data version>.png``. The data
+version hashes the source layers, so editing a layer re-renders its maps
+while switching sites in the app is just a file read. Render ahead of time
+with the CLI; the apps only start the CLI in the background
+(``render_in_background``) and show a placeholder until a site's PNG
+exists, so neither the rerun nor the Streamlit server process does the
+rendering.
+
+    python -m landfill_sdss.thumbnails "Seneca Meadows Landfill" "DANC Regional Landfill"
+"""
+import argparse
+import hashlib
+import multiprocessing as mp
+import os
+import re
+import subprocess
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from .cache import cache_path
+from .config import BUFFER_FT, ROOT_DIR
+from .layers import REGISTRY, SITE_LOCATIONS, load_layer, site_location
+
+KINDS = ('hydro', 'ej')
+RENDER_VERSION = 1          # bump when the drawing code changes
+HALF_WIDTH_FT = 3 * 5280    # map extent: 3 miles around the site
+SIZE_IN, DPI = 4, 100
+
+_background = {}   # (sites, hazards, version) -> CLI render process
+_background_lock = threading.Lock()
+
+
+def data_version(hazards=()):
+    """Short hash of every source a thumbnail depends on (layers + site locations)."""
+    stems = [REGISTRY.cached_path(n).stem for n in ('candidates', 'dac', *hazards)]
+    locations = sorted(SITE_LOCATIONS.items())
+    return hashlib.sha1(f"{RENDER_VERSION}{stems}{locations}".encode()).hexdigest()[:10]
+
+
+def _slug(site):
+    return re.sub(r'[^a-z0-9]+', '-', site.lower()).strip('-')
+
+
+def thumbnail_path(site, kind, version):
+    return cache_path('thumbnails', f"{kind}-{_slug(site)}-{version}", '.png')
+
+
+def _render(site, kind, hazards, out):
+    from matplotlib.figure import Figure
+
+    row = site_location(site)
+    fig = Figure(figsize=(SIZE_IN, SIZE_IN), dpi=DPI)
+    ax = fig.add_subplot()
+    ax.set_axis_off()
+    if row is None:
+        ax.text(0.5, 0.5, f"{site}\n(no mapped location)", ha='center', va='center',
+                transform=ax.transAxes)
+    else:
+        pt = row.geometry
+        bbox = (pt.x - HALF_WIDTH_FT, pt.y - HALF_WIDTH_FT, pt.x + HALF_WIDTH_FT, pt.y + HALF_WIDTH_FT)
+        if kind == 'hydro':
+            for h in hazards:
+                layer = load_layer(h, columns=[], bbox=bbox)
+                if not layer.empty:
+                    layer.plot(ax=ax, color='#1e6ec8', alpha=0.45)
+        else:
+            dac = load_layer('dac', columns=['Rank_State'], bbox=bbox)
+            if not dac.empty:
+                dac.plot(ax=ax, column='Rank_State', cmap='Reds', vmin=0, vmax=100,
+                         edgecolor='grey', linewidth=0.3, alpha=0.7)
+        buf = pt.buffer(BUFFER_FT)
+        ax.fill(*buf.exterior.xy, facecolor='none', edgecolor='#fa8c00', linewidth=1.5)
+        ax.plot(pt.x, pt.y, 'o', color='#c81e1e', markersize=6)
+        ax.set_xlim(bbox[0], bbox[2])
+        ax.set_ylim(bbox[1], bbox[3])
+        ax.set_aspect('equal')
+    ax.set_title(f"{'Hydro-Risk' if kind == 'hydro' else 'EJ Index'}: {site}", fontsize=8)
+    fig.savefig(out, bbox_inches='tight')
+    return out
+
+
+def _render_site(args):
+    site, hazards, version = args
+    for kind in KINDS:
+        out = thumbnail_path(site, kind, version)
+        if not out.exists():
+            tmp = out.with_suffix('.tmp.png')
+            _render(site, kind, hazards, tmp)
+            tmp.replace(out)
+    return site
+
+
+def render_thumbnails(sites, hazards=(), workers=None):
+    """Render missing thumbnails for ``sites``; returns the data version."""
+    version = data_version(hazards)
+    todo = [s for s in sites
+            if not all(thumbnail_path(s, k, version).exists() for k in KINDS)]
+    if todo:
+        # build the cached layer copies once, before the workers read them
+        for name in ('candidates', 'dac', *hazards):
+            load_layer(name, columns=[])
+        # spawn, not fork: the apps call this from the multithreaded Streamlit server
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                 mp_context=mp.get_context('spawn')) as pool:
+            list(pool.map(_render_site, [(s, tuple(hazards), version) for s in todo]))
+    return version
+
+
+def render_in_background(sites, hazards=(), workers=None):
+    """Render missing thumbnails through the CLI in a separate process; returns the data version.
+
+    Returns at once (one process per site list and data version), so an app
+    rerun never waits for matplotlib or a layer cache build. The worker pool
+    runs outside the Streamlit server: Streamlit installs the app script as
+    ``__main__``, which spawned workers would execute again.
+    """
+    version = data_version(hazards)
+    key = (tuple(sites), tuple(hazards), version)
+    with _background_lock:
+        missing = not all(thumbnail_path(s, k, version).exists() for s in sites for k in KINDS)
+        if key not in _background and missing:
+            cmd = [sys.executable, '-m', 'landfill_sdss.thumbnails', *sites]
+            for h in hazards:
+                cmd += ['--hazard', str(h)]
+            if workers:
+                cmd += ['--workers', str(workers)]
+            with open(cache_path('thumbnails', 'render', '.log'), 'a') as log:
+                _background[key] = subprocess.Popen(cmd, cwd=ROOT_DIR, stdout=subprocess.DEVNULL,
+                                                    stderr=log)
+    return version
+
+
+def render_failed(version):
+    """True if a background render for ``version`` exited with an error."""
+    return any(key[2] == version and proc.poll() not in (None, 0)
+               for key, proc in _background.items())
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('sites', nargs='*', help='site names (default: every candidate)')
+    ap.add_argument('--hazard', action='append', default=[], help='hazard layer (repeatable)')
+    ap.add_argument('--workers', type=int)
+    a = ap.parse_args()
+
+    sites = a.sites or load_layer('candidates', columns=['Facility Name'])['Facility Name'].tolist()
+    version = render_thumbnails(sites, a.hazard, a.workers)
+    for s in sites:
+        print(*(thumbnail_path(s, k, version) for k in KINDS))
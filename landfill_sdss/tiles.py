@@ -0,0 +1,253 @@
+"""Pre-generated vector tiles (MVT in MBTiles) and a local tile endpoint.
+
+Shipping whole GeoJSON layers (the DAC polygons especially) to the browser
+is slow, so each map layer is cut once into Mapbox Vector Tiles per zoom and
+stored as ``.sdss_cache/tiles/<layer>-<source hash>.mbtiles``. A small
+threaded HTTP server then answers ``/<layer>/<z>/<x>/<y>.pbf`` straight from
+those files, and the map only fetches the tiles in view.
+
+    python -m landfill_sdss.tiles --hazard fema_floodplain.shp --serve
+"""
+import argparse
+import gzip
+import json
+import multiprocessing as mp
+import os
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from .cache import cache_path
+from .config import BUFFER_FT
+from .layers import REGISTRY, load_layer
+from .lazy import lazy_import
+
+mapbox_vector_tile = lazy_import('mapbox_vector_tile')
+shapely = lazy_import('shapely')
+
+WEB_MERCATOR = 'EPSG:3857'
+HALF_WORLD = 20037508.342789244
+EXTENT  = 4096
+MINZOOM = 5
+MAXZOOM = 12
+HOST    = os.environ.get('SDSS_TILE_HOST', '127.0.0.1')   # 0.0.0.0 to serve other machines
+PORT    = int(os.environ.get('SDSS_TILE_PORT', 8765))
+
+# layer -> (registry source, attribute columns kept in the tiles)
+TILE_LAYERS = {
+    'candidates': ('candidates', ['Facility Name', 'County', 'Out-of-County Tipping Fee ($/ton)']),
+    'buffers':    ('candidates', ['Facility Name']),
+    'dac':        ('dac', ['GEOID', 'County', 'Rank_State', 'Pop_Cnt']),
+}
+
+
+def tile_bounds(z, x, y):
+    """Web-Mercator bounds of XYZ tile (y counted from the top)."""
+    size = 2 * HALF_WORLD / 2 ** z
+    minx = -HALF_WORLD + x * size
+    maxy = HALF_WORLD - y * size
+    return minx, maxy - size, minx + size, maxy
+
+
+def _tile_range(bounds, z):
+    n = 2 ** z
+    size = 2 * HALF_WORLD / n
+    minx, miny, maxx, maxy = bounds
+    x0 = int(np.clip((minx + HALF_WORLD) // size, 0, n - 1))
+    x1 = int(np.clip((maxx + HALF_WORLD) // size, 0, n - 1))
+    y0 = int(np.clip((HALF_WORLD - maxy) // size, 0, n - 1))
+    y1 = int(np.clip((HALF_WORLD - miny) // size, 0, n - 1))
+    return range(x0, x1 + 1), range(y0, y1 + 1)
+
+
+def _props(row, columns):
+    out = {}
+    for c in columns:
+        v = row[c]
+        if v is None or (isinstance(v, float) and np.isnan(v)):
+            continue
+        out[c] = v.item() if hasattr(v, 'item') else v
+    return out
+
+
+_W = {}
+
+
+def _init_worker(name, gdf, columns):
+    _W.update(name=name, gdf=gdf, columns=columns)
+
+
+def _encode_zoom(z):
+    """All non-empty tiles of one zoom level: [(z, x, y, gzipped pbf)]."""
+    gdf, columns, name = _W['gdf'], _W['columns'], _W['name']
+    pixel = 2 * HALF_WORLD / 2 ** z / EXTENT
+    geoms = shapely.simplify(gdf.geometry.values, pixel, preserve_topology=True)
+    tree = shapely.STRtree(geoms)
+    tiles = set()
+    for b in shapely.bounds(geoms):
+        xs, ys = _tile_range(b, z)
+        tiles.update((x, y) for x in xs for y in ys)
+
+    out = []
+    for x, y in sorted(tiles):
+        bounds = tile_bounds(z, x, y)
+        clip = shapely.box(*bounds).buffer(pixel * 64, join_style='mitre')
+        features = []
+        for i in tree.query(clip, predicate='intersects'):
+            g = shapely.intersection(geoms[i], clip)
+            if g.is_empty:
+                continue
+            features.append({'geometry': g, 'properties': _props(gdf.iloc[i], columns)})
+        if features:
+            pbf = mapbox_vector_tile.encode(
+                [{'name': name, 'features': features}],
+                default_options={'quantize_bounds': bounds, 'extents': EXTENT})
+            out.append((z, x, y, gzip.compress(pbf)))
+    return out
+
+
+def write_mbtiles(path, name, gdf, columns, minzoom=MINZOOM, maxzoom=MAXZOOM, workers=None):
+    """Encode ``gdf`` (any CRS) into an MBTiles file, one zoom per worker."""
+    gdf = gdf[~(gdf.geometry.isna() | gdf.geometry.is_empty)].to_crs(WEB_MERCATOR)
+    gdf = gdf[[*columns, 'geometry']].reset_index(drop=True)
+    tmp = path.with_suffix('.tmp')
+    tmp.unlink(missing_ok=True)
+    con = sqlite3.connect(tmp)
+    con.executescript("""
+        CREATE TABLE metadata (name TEXT, value TEXT);
+        CREATE TABLE tiles (zoom_level INTEGER, tile_column INTEGER,
+                            tile_row INTEGER, tile_data BLOB);
+        CREATE UNIQUE INDEX tile_index ON tiles (zoom_level, tile_column, tile_row);
+    """)
+    lon_lat = gdf.to_crs('EPSG:4326').total_bounds
+    meta = {
+        'name': name, 'format': 'pbf', 'minzoom': minzoom, 'maxzoom': maxzoom,
+        'bounds': ','.join(f"{v:.6f}" for v in lon_lat),
+        'json': json.dumps({'vector_layers': [
+            {'id': name, 'fields': {c: 'String' for c in columns},
+             'minzoom': minzoom, 'maxzoom': maxzoom}]}),
+    }
+    con.executemany("INSERT INTO metadata VALUES (?, ?)", [(k, str(v)) for k, v in meta.items()])
+    # spawn, not fork: the apps build tiles from the multithreaded Streamlit server
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), mp_context=mp.get_context('spawn'),
+                             initializer=_init_worker, initargs=(name, gdf, columns)) as pool:
+        for tiles in pool.map(_encode_zoom, range(minzoom, maxzoom + 1)):
+            # MBTiles rows are TMS: flip y
+            con.executemany("INSERT INTO tiles VALUES (?, ?, ?, ?)",
+                            [(z, x, 2 ** z - 1 - y, data) for z, x, y, data in tiles])
+            con.commit()
+    con.close()
+    tmp.replace(path)
+    return path
+
+
+def _layer_frame(layer, source, columns):
+    gdf = load_layer(source, columns=columns)
+    if layer == 'buffers':
+        gdf['geometry'] = gdf.geometry.buffer(BUFFER_FT)
+    return gdf
+
+
+def _specs(hazards):
+    specs = dict(TILE_LAYERS)
+    for h in hazards:
+        specs[f"hazard_{os.path.splitext(os.path.basename(str(h)))[0]}"] = (h, [])
+    return specs
+
+
+def tileset_paths(hazards=(), minzoom=MINZOOM, maxzoom=MAXZOOM):
+    """{layer: MBTiles path} for the current sources (built or not)."""
+    return {layer: cache_path('tiles', f"{layer}-{REGISTRY.cached_path(source).stem}"
+                                       f"-z{minzoom}-{maxzoom}", '.mbtiles')
+            for layer, (source, _) in _specs(hazards).items()}
+
+
+def build_tileset(hazards=(), minzoom=MINZOOM, maxzoom=MAXZOOM, workers=None):
+    """MBTiles per map layer (candidates, buffers, dac, hazards); cached.
+
+    Returns {layer: path}. A layer is only re-encoded when its source changed.
+    """
+    specs = _specs(hazards)
+    out = tileset_paths(hazards, minzoom, maxzoom)
+    for layer, path in out.items():
+        if not path.exists():
+            source, columns = specs[layer]
+            write_mbtiles(path, layer, _layer_frame(layer, source, columns), columns,
+                          minzoom, maxzoom, workers)
+    return out
+
+
+class _TileHandler(BaseHTTPRequestHandler):
+    tilesets = {}
+
+    def do_GET(self):
+        try:
+            layer, z, x, y = self.path.strip('/').split('/')
+            z, x, y = int(z), int(x), int(y.split('.')[0])
+            path = self.tilesets[layer]
+        except (ValueError, KeyError):
+            self.send_error(404)
+            return
+        con = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            row = con.execute(
+                "SELECT tile_data FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+                (z, x, 2 ** z - 1 - y)).fetchone()
+        finally:
+            con.close()
+        if row is None:
+            self.send_response(204)
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/vnd.mapbox-vector-tile')
+        self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Cache-Control', 'public, max-age=86400')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(row[0])
+
+    def log_message(self, *args):
+        pass
+
+
+_servers = {}
+
+
+def serve_tiles(tilesets, port=PORT):
+    """Start (once per process) the tile endpoint; returns its base URL.
+
+    Binds ``HOST`` (loopback unless SDSS_TILE_HOST is set); set SDSS_TILE_URL
+    when the browser reaches the server under another host.
+    """
+    _TileHandler.tilesets.update({k: str(v) for k, v in tilesets.items()})
+    if port not in _servers:
+        server = ThreadingHTTPServer((HOST, port), _TileHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        _servers[port] = server
+    return os.environ.get('SDSS_TILE_URL', f"http://localhost:{port}")
+
+
+def tile_url(base, layer):
+    return f"{base}/{layer}/{{z}}/{{x}}/{{y}}.pbf"
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--hazard', action='append', default=[], help='hazard layer (repeatable)')
+    ap.add_argument('--minzoom', type=int, default=MINZOOM)
+    ap.add_argument('--maxzoom', type=int, default=MAXZOOM)
+    ap.add_argument('--workers', type=int)
+    ap.add_argument('--serve', action='store_true', help='keep serving tiles after building')
+    a = ap.parse_args()
+
+    sets = build_tileset(a.hazard, a.minzoom, a.maxzoom, a.workers)
+    for layer, path in sets.items():
+        print(f"{layer}: {path}")
+    if a.serve:
+        print(f"serving on {serve_tiles(sets)}")
+        threading.Event().wait()
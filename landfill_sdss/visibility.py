@@ -0,0 +1,219 @@
+"""Population visibility index (Python port of SDSS/3-Visibility-Index).
+
+For each candidate the footprint is grown by the scenario's
+``expansion_acreage`` and raised by ``height_increase_ft`` on the DEM. A cell
+"sees" the landfill when the line of sight from an observer standing on it
+to any sample point on the raised mound clears the terrain in between. The
+index is the share of population within ``radius_ft`` living in such cells.
+
+Line of sight is vectorized: every cell in a tile of rows is tested against
+``SAMPLES`` points along its ray at once, so memory is bounded by the tile
+size. Sites run in a process pool; each worker opens the rasters once.
+A population raster is counted on its own grid (``_pop_share``), so a grid
+coarser or finer than the DEM keeps its totals.
+
+    python -m landfill_sdss.visibility dem.tif --scenario scenario.json
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .layers import REGISTRY, load_layer, raster_path
+from .lazy import lazy_import
+
+rasterio = lazy_import('rasterio')
+features = lazy_import('rasterio.features')
+rio_windows = lazy_import('rasterio.windows')
+shapely_geometry = lazy_import('shapely.geometry')
+
+SQFT_PER_ACRE = 43560
+RADIUS_FT   = 5 * 5280     # viewshed radius: 5 miles
+EYE_FT      = 5.5          # observer eye height
+SAMPLES     = 64           # terrain samples along each line of sight
+ROW_TILE    = 16           # DEM rows tested per vectorized step
+MOUND_PTS   = 8            # footprint boundary points used as targets
+
+# per-worker state, filled once by _init_worker
+_W = {}
+
+
+def expanded_footprint(geom, expansion_acreage):
+    """Footprint grown by ``expansion_acreage`` acres.
+
+    Points become a disc of that area; polygons are buffered outward by
+    area / perimeter, which adds roughly that much area.
+    """
+    extra = expansion_acreage * SQFT_PER_ACRE
+    if geom.geom_type == 'Point':
+        return geom.buffer(np.sqrt(extra / np.pi))
+    return geom.buffer(extra / max(geom.length, 1.0))
+
+
+def _mound_points(footprint):
+    ring = footprint.exterior
+    pts = [footprint.centroid] + [ring.interpolate(t, normalized=True)
+                                  for t in np.linspace(0, 1, MOUND_PTS, endpoint=False)]
+    return np.array([(p.x, p.y) for p in pts])
+
+
+def line_of_sight(dem, targets_rc, target_z, eye=EYE_FT, samples=SAMPLES, row_tile=ROW_TILE):
+    """Boolean grid: cells with a clear view of at least one target.
+
+    ``targets_rc``: (k, 2) fractional row/col of targets; ``target_z``: their
+    elevations. Terrain between observer and target is sampled (nearest
+    cell) at ``samples`` points and compared with the sight line.
+    """
+    nrows, ncols = dem.shape
+    t = np.linspace(0, 1, samples + 2)[1:-1]          # exclude both endpoints
+    cols = np.arange(ncols)
+    seen = np.zeros(dem.shape, dtype=bool)
+    for r0 in range(0, nrows, row_tile):
+        rr, cc = np.meshgrid(np.arange(r0, min(r0 + row_tile, nrows)), cols, indexing='ij')
+        z0 = dem[rr, cc] + eye
+        vis = np.zeros(rr.shape, dtype=bool)
+        for (tr, tc), tz in zip(targets_rc, target_z):
+            # sample positions: (tile_rows, ncols, samples)
+            sr = rr[..., None] + (tr - rr[..., None]) * t
+            sc = cc[..., None] + (tc - cc[..., None]) * t
+            ground = dem[np.clip(np.rint(sr).astype(int), 0, nrows - 1),
+                         np.clip(np.rint(sc).astype(int), 0, ncols - 1)]
+            sight = z0[..., None] + (tz - z0[..., None]) * t
+            vis |= np.all(ground <= sight, axis=-1)
+        seen[r0:r0 + vis.shape[0]] = vis
+    return seen
+
+
+def _init_worker(dem_path, pop_path, z_factor):
+    _W['dem'] = rasterio.open(dem_path)
+    _W['pop'] = rasterio.open(pop_path) if pop_path else None
+    _W['z_factor'] = z_factor
+
+
+def _read_window(src, bounds):
+    # whole cells at the raster's own resolution, so the transform matches the data
+    win = rio_windows.from_bounds(*bounds, transform=src.transform)
+    win = win.round_offsets().round_lengths()
+    arr = src.read(1, window=win, boundless=True, fill_value=0, masked=True)
+    return arr.filled(0).astype('float32'), src.window_transform(win)
+
+
+def _pop_share(pop, pop_transform, mask, transform):
+    """Population of the cells where ``mask`` (a DEM-grid boolean) holds.
+
+    Counted on the population grid, so totals are kept at any resolution:
+    a population cell contributes the share of the DEM cells (by centre)
+    inside it that are in ``mask``; one smaller than a DEM cell takes the
+    value of the DEM cell under its centre.
+    """
+    rows, cols = np.indices(mask.shape)
+    xs, ys = transform * (cols.ravel() + 0.5, rows.ravel() + 0.5)
+    pc, pr = ~pop_transform * (xs, ys)
+    pr, pc = np.floor(pr).astype(int), np.floor(pc).astype(int)
+    ok = (pr >= 0) & (pr < pop.shape[0]) & (pc >= 0) & (pc < pop.shape[1])
+    flat = pr[ok] * pop.shape[1] + pc[ok]
+    n = np.bincount(flat, minlength=pop.size)
+    share = np.bincount(flat, weights=mask.ravel()[ok], minlength=pop.size) / np.maximum(n, 1)
+
+    empty = np.flatnonzero(n == 0)
+    if len(empty):
+        r, c = np.divmod(empty, pop.shape[1])
+        dc, dr = ~transform * (pop_transform * (c + 0.5, r + 0.5))
+        dr, dc = np.floor(dr).astype(int), np.floor(dc).astype(int)
+        inb = (dr >= 0) & (dr < mask.shape[0]) & (dc >= 0) & (dc < mask.shape[1])
+        share[empty[inb]] = mask[dr[inb], dc[inb]]
+    return float((pop.ravel() * share).sum())
+
+
+def _site_visibility(args):
+    site, geom, height_ft, radius = args
+    dem_src, pop_src = _W['dem'], _W['pop']
+    cx, cy = geom.centroid.x, geom.centroid.y
+    bounds = (cx - radius, cy - radius, cx + radius, cy + radius)
+    ground, transform = _read_window(dem_src, bounds)
+    ground *= _W['z_factor']
+
+    # raise the DEM inside the footprint by the scenario height increase
+    inside = features.rasterize([(geom, 1)], out_shape=ground.shape, transform=transform,
+                                fill=0, dtype='uint8').astype(bool)
+    dem = ground.copy()
+    dem[inside] += height_ft
+
+    # targets sit on the raised mound: boundary points can fall on cells the
+    # rasterized footprint misses, so take ground + height, not dem[target]
+    targets = _mound_points(geom)
+    inv = ~transform
+    rc = np.array([inv * (x, y) for x, y in targets])[:, ::-1] - 0.5
+    rc = np.clip(rc, 0, np.array(dem.shape) - 1)
+    tz = ground[np.rint(rc[:, 0]).astype(int), np.rint(rc[:, 1]).astype(int)] + height_ft
+    seen = line_of_sight(dem, rc, tz) & ~inside
+
+    in_radius = features.rasterize([(shapely_geometry.Point(cx, cy).buffer(radius), 1)], out_shape=dem.shape,
+                                   transform=transform, fill=0, dtype='uint8').astype(bool)
+    if pop_src is not None:
+        pop, pop_transform = _read_window(pop_src, bounds)
+        total = _pop_share(pop, pop_transform, in_radius, transform)
+        visible = _pop_share(pop, pop_transform, seen & in_radius, transform)
+    else:
+        pop = _dac_population(bounds, dem.shape, transform)
+        total = float(pop[in_radius].sum())
+        visible = float(pop[seen & in_radius].sum())
+    return {'Site': site, 'Visible_Pop': round(visible), 'Pop_in_Radius': round(total),
+            'Visibility_Index': visible / total if total else 0.0}
+
+
+def _dac_population(bounds, shape, transform):
+    """Pop_Cnt spread evenly over each DAC tract, rasterized to the window."""
+    dac = load_layer('dac', columns=['Pop_Cnt'], bbox=bounds)
+    if dac.empty:
+        return np.zeros(shape, dtype='float32')
+    cell_area = abs(transform.a * transform.e)
+    density = dac['Pop_Cnt'] / dac.geometry.area * cell_area
+    return features.rasterize(zip(dac.geometry, density), out_shape=shape,
+                              transform=transform, fill=0, dtype='float32')
+
+
+def visibility_index(sites, scenario, dem, population=None, site_col='Site',
+                     radius_ft=RADIUS_FT, z_factor=1.0, workers=None):
+    """Visibility_Index per site for one scenario.
+
+    ``sites``: GeoDataFrame in EPSG:2260 (points or footprints).
+    ``dem``: DEM path (warped to EPSG:2260 once if needed); ``z_factor``
+    converts its elevations to feet (3.28084 for a metre DEM).
+    ``population``: population-count raster path; defaults to DAC Pop_Cnt.
+    """
+    spatial = scenario['spatial_params']
+    height = spatial.get('height_increase_ft', 0)
+    acres = spatial.get('expansion_acreage', 0)
+    jobs = [(row[site_col], expanded_footprint(row.geometry, acres), height, radius_ft)
+            for _, row in sites.iterrows()]
+
+    dem = str(raster_path(dem))
+    pop = str(raster_path(population)) if population is not None else None
+    if pop is None:
+        REGISTRY.ensure('dac')  # build once here, not in every worker
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                             initializer=_init_worker, initargs=(dem, pop, z_factor)) as pool:
+        rows = list(pool.map(_site_visibility, jobs))
+    return pd.DataFrame(rows)
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('dem')
+    ap.add_argument('--population', help='population-count raster (default: DAC Pop_Cnt)')
+    ap.add_argument('--scenario', default='scenario.json')
+    ap.add_argument('--sites', default='candidates', help='site layer name or path')
+    ap.add_argument('--site-col', default='Facility Name')
+    ap.add_argument('--z-factor', type=float, default=1.0)
+    ap.add_argument('--workers', type=int)
+    a = ap.parse_args()
+
+    with open(a.scenario) as f:
+        scenario = json.load(f)
+    df = visibility_index(load_layer(a.sites), scenario, a.dem, a.population,
+                          site_col=a.site_col, z_factor=a.z_factor, workers=a.workers)
+    print(df.sort_values('Visibility_Index', ascending=False).to_string(index=False))
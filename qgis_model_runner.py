@@ -0,0 +1,39 @@
+"""Run one scenario through the warm headless model runner.
+
+    python qgis_model_runner.py scenario.json --out results/
+
+Sends the scenario to ``landfill_sdss.runner`` (starting it in the
+background if it is not running yet, so only the first run pays the QGIS
+startup) and prints its JSON-line progress / stage events on stdout, which
+is what the scenario job queue reads. ``--cold`` runs in this process
+instead, without a server.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from landfill_sdss.runner import ensure_server, make_backend, run_once, submit
+
+
+def emit(event):
+    print(json.dumps(event), flush=True)
+    if 'error' in event:
+        print(event.get('traceback') or event['error'], file=sys.stderr)
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('scenario', help='scenario JSON file')
+    ap.add_argument('--out', default='outputs', help='directory for model outputs')
+    ap.add_argument('--cold', action='store_true', help='run in-process, without the warm runner')
+    ap.add_argument('--backend', choices=['qgis', 'stub'], help='backend for --cold runs')
+    a = ap.parse_args()
+
+    scenario = json.loads(Path(a.scenario).read_text())
+    out = Path(a.out).resolve()
+    if not a.cold and ensure_server():
+        ok = submit(scenario, out, emit)
+    else:
+        ok = run_once(make_backend(a.backend), scenario, out, emit)
+    sys.exit(0 if ok else 1)
@@ -1,6 +1,12 @@
+import sys
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from landfill_sdss.maps import ej_deck, hydro_risk_deck, map_chart
+
 # --- Page config ---
 st.set_page_config(page_title="Landfill SDSS Allocation Tool", layout="wide")
 st.title("Landfill SDSS: Tonnage Allocation & Metrics")
@@ -125,15 +131,15 @@ if total >= 1250 and sum_d == horizon:
         })
         st.table(tbl.round(2))
         st.write(f"**Totals** Cap={cap.sum():,.0f} t·yr, Rev=${rev.sum():,.2f}, Rev/yr avg=${per_yr.sum():,.2f}")
-    # Maps
+    # Maps: vector tiles from the local tile endpoint (landfill_sdss.tiles)
     map_site = st.selectbox("Map view site", df_sel['Site'])
     c1, c2 = st.columns(2)
     with c1:
         st.subheader("Hydro-Risk Map")
-        st.info("⚙️ st.image('assets/hydro_risk.png')")
+        map_chart(st, hydro_risk_deck, map_site)
     with c2:
         st.subheader("EJ Index Map")
-        st.info("⚙️ st.image('assets/ej_index.png')")
+        map_chart(st, ej_deck, map_site)
 else:
     if total < 1250:
         st.info("Allocate at least 1,250 t/d in sidebar.")
@@ -1,5 +1,14 @@
+import sys
+from pathlib import Path
+
 import streamlit as st
-import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from landfill_sdss.maps import ej_deck, hydro_risk_deck, map_chart
+from landfill_sdss.pipeline import Versioned, allocation_graph, fingerprint
+from landfill_sdss.profiling import Recorder, performance_panel, stage, use_recorder
+from landfill_sdss.results import ResultsStore, record_allocation
+from landfill_sdss.thumbnails import render_failed, render_in_background, thumbnail_path
 
 # --- Page config ---
 st.set_page_config(page_title="Landfill SDSS Allocation Tool", layout="wide")
@@ -20,8 +29,40 @@ site_data = [
     {"Site": "Potential Site H (Plattekill)","Tipping_Fee":85,   "Project_Name":"UCRRA Site H Candidate",        "Design_Capacity_tpd":3000, "Service_Horizon_(yr)":30, "Electric_Power_MW":43.2,"Hydrological_Risk":0.491, "EJ_Rating":0.2, "Dist_to_rail_mi": 5.0, "Dist_to_hwy_mi": 1.0},
     {"Site": "Potential Site I (Plattekill)","Tipping_Fee":85,   "Project_Name":"UCRRA Site I Candidate",        "Design_Capacity_tpd":2700, "Service_Horizon_(yr)":30, "Electric_Power_MW":33.2,"Hydrological_Risk":0.74,  "EJ_Rating":0.5, "Dist_to_rail_mi": 5.0, "Dist_to_hwy_mi": 1.0}
 ]
-ndf = pd.DataFrame(site_data)
-max_fee = ndf['Tipping_Fee'].max()
+# Memoized pipeline: site data -> scores -> allocation -> phases -> display.
+# Kept per session so a rerun only recomputes stages whose inputs changed.
+if 'graph' not in st.session_state:
+    st.session_state.graph = allocation_graph()
+graph = st.session_state.graph
+# the site list is hashed once per rerun (9 rows), so edits to site_data are
+# picked up on the next rerun; graph.get() calls below only compare the token
+sites = Versioned(site_data, fingerprint(site_data))
+# Stage timings for this rerun (shown in the Performance expander below)
+perf = use_recorder(st.session_state.setdefault('perf', Recorder()))
+perf.new_run()
+# allocation tracing costs several times a stage's run time: only while shown
+perf.trace_allocs = st.session_state.get('show_perf', False)
+
+
+# --- Map thumbnails (rendered in the background, placeholder until ready) ---
+@st.fragment(run_every=2)
+def thumbnail_placeholder(path, version):
+    # polls until the background render writes the PNG, then reruns the app
+    if path.exists():
+        st.rerun()
+    if render_failed(version):
+        st.warning("Thumbnail rendering failed, see .sdss_cache/thumbnails/render.log")
+    else:
+        st.info("Rendering map thumbnail…")
+
+
+def show_thumbnail(site, kind, version):
+    path = thumbnail_path(site, kind, version)
+    if path.exists():
+        st.image(str(path))
+    else:
+        thumbnail_placeholder(path, version)
+
 
 # --- Sidebar: Ranking Weights & Threshold ---
 st.sidebar.header("1) Ranking Weights & Threshold")
@@ -29,16 +70,10 @@ w_cost     = st.sidebar.slider("Cost weight",      0.0, 1.0, 0.3)
 w_capacity = st.sidebar.slider("Capacity weight",  0.0, 1.0, 0.3)
 w_risk     = st.sidebar.slider("HydroRisk weight", 0.0, 1.0, 0.2)
 w_ej       = st.sidebar.slider("EJ weight",        0.0, 1.0, 0.2)
-w_sum = w_cost + w_capacity + w_risk + w_ej
-w_cost, w_capacity, w_risk, w_ej = [w/w_sum for w in (w_cost, w_capacity, w_risk, w_ej)]
+weights = {'cost': w_cost, 'capacity': w_capacity, 'risk': w_risk, 'ej': w_ej}
 thresh = st.sidebar.slider("Min. feasibility score", 0.0, 1.0, 0.2)
-# Pre-compute feasibility
-ndf['Feasibility'] = (
-    (1-ndf['Tipping_Fee']/max_fee)*w_cost
-    +1.0*w_capacity
-    +(1-ndf['Hydrological_Risk'])*w_risk
-    + (1-ndf['EJ_Rating'])*w_ej
-)
+# Feasibility (normalized weights), only recomputed when sites/weights change
+ndf = graph.get('scores', sites=sites, weights=weights)
 
 # --- Sidebar: Allocation ---
 st.sidebar.header("2) Select & Allocate ≥1250 t/d")
@@ -82,60 +117,59 @@ durations = _durs
 # --- Main display ---
 st.subheader("Allocation, Metrics & Phases")
 if total >= 1250 and sum_d == horizon:
-    # Build selected DataFrame
-    df_sel = pd.DataFrame([
-        {**ndf[ndf['Site']==s].iloc[0].to_dict(), 'Assigned_tpd': alloc[s]}
-        for s in selected_sites if alloc[s] > 0
-    ])
-    # Compute metrics
-    df_sel['Cost_score']     = (1 - df_sel['Tipping_Fee']/max_fee)
-    df_sel['Capacity_score'] = df_sel['Assigned_tpd'] / df_sel['Design_Capacity_tpd']
-    df_sel['Risk_score']     = 1 - df_sel['Hydrological_Risk']
-    df_sel['EJ_score']       = 1 - df_sel['EJ_Rating']
-    df_sel['Composite']      = (
-        w_cost*df_sel['Cost_score'] + w_capacity*df_sel['Capacity_score']
-        + w_risk*df_sel['Risk_score'] + w_ej*df_sel['EJ_score']
-    )
-    # Format
-    for col in ['Tipping_Fee','Electric_Power_MW','EJ_Rating','Composite']:
-        df_sel[col] = df_sel[col].round(2)
-    df_sel[['Service_Horizon_(yr)','Design_Capacity_tpd','Assigned_tpd']] = \
-        df_sel[['Service_Horizon_(yr)','Design_Capacity_tpd','Assigned_tpd']].astype(int)
     display_cols = [
         'Site','Project_Name','Service_Horizon_(yr)','Electric_Power_MW',
         'Assigned_tpd','Tipping_Fee','Design_Capacity_tpd',
         'Dist_to_rail_mi','Dist_to_hwy_mi',
         'Hydrological_Risk','EJ_Rating','Composite'
     ]
-    st.table(df_sel[display_cols].sort_values('Composite', ascending=False))
+    table, phase_tables = graph.get(
+        'display', sites=sites, weights=weights, alloc=alloc,
+        durations=durations, display_cols=display_cols
+    )
+    df_sel = table
+    st.table(table)
 
     # Phase analysis & totals
-    for idx, dur in enumerate(durations, 1):
-        cap = df_sel['Assigned_tpd'] * 365 * dur
-        rev = cap * df_sel['Tipping_Fee']
-        per_yr = rev / dur
+    for idx, dur, tbl, cap_sum, rev_sum, per_yr_sum in phase_tables:
         st.subheader(f"Phase {idx} ({dur} yrs)")
-        tbl = pd.DataFrame({
-            'Site': df_sel['Site'],
-            f'Phase{idx}_Cap': cap,
-            f'/nPhase{idx}_Rev': rev,
-            f'/nP{idx}_Rev_per_yr': per_yr
-        })
-        st.table(tbl.round(2))
-        st.markdown(f"**Totals**: Cap={cap.sum():,.0f} t·yr, Rev=${rev.sum():,.2f}, Rev/yr avg=${per_yr.sum():,.2f}")
-
-    # Maps using user-specified dummy files
+        st.table(tbl)
+        st.markdown(f"**Totals**: Cap={cap_sum:,.0f} t·yr, Rev=${rev_sum:,.2f}, Rev/yr avg=${per_yr_sum:,.2f}")
+
+    # Append this allocation to the results store for later comparison
+    if st.button("Save run to results store"):
+        run_id = record_allocation(
+            ResultsStore(), {'weights': weights, 'min_feasibility': thresh, 'durations': durations},
+            ndf, graph.get('allocation', sites=sites, weights=weights, alloc=alloc),
+            phase_tables)
+        st.success(f"Saved as run `{run_id}`")
+
+    # Maps: cached per-site thumbnails (landfill_sdss.thumbnails), rendered
+    # offline by the CLI (started in the background if any are missing);
+    # switching sites only reads a PNG. The interactive view streams vector tiles from the local tile
+    # endpoint instead.
+    with stage('thumbnails'):
+        thumb_version = render_in_background(ndf['Site'].tolist())
     map_site = st.selectbox("Map view site", df_sel['Site'])
+    interactive = st.toggle("Interactive maps", value=False)
     c1, c2 = st.columns(2)
-    with c1:
+    with c1, stage('hydro map'):
         st.subheader("Hydro-Risk Map")
-        st.image('/home/gamfeld/Hunter/S25/GTECH-361/Project/Data/TEP.png', caption=f"Hydro-Risk: {map_site}")
-    with c2:
+        if interactive:
+            map_chart(st, hydro_risk_deck, map_site)
+        else:
+            show_thumbnail(map_site, 'hydro', thumb_version)
+    with c2, stage('ej map'):
         st.subheader("EJ Index Map")
-        st.image('/home/gamfeld/Hunter/S25/GTECH-361/Project/Data/EJSCREEN.tiff', caption=f"EJ Index: {map_site}")
+        if interactive:
+            map_chart(st, ej_deck, map_site)
+        else:
+            show_thumbnail(map_site, 'ej', thumb_version)
 else:
     if total < 1250:
         st.info("Allocate at least 1,250 t/d in sidebar.")
     if sum_d != horizon:
         st.info("Ensure phase durations sum to total horizon.")
 
+if st.sidebar.checkbox("Show performance", value=False, key='show_perf'):
+    performance_panel(st, perf)
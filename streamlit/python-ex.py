@@ -1,19 +1,17 @@
-import geopandas as gpd
+import sys
+from pathlib import Path
+
 import rasterio
-from rasterio.mask import mask
-import numpy as np
 
-# target CRS
-TARGET_CRS = 'EPSG:2260'  # NAD83 / New York East (ftUS)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from landfill_sdss.criteria import hydro_fractions, hydro_risk
+from landfill_sdss.layers import load_layer, raster_path
 
 # --- 1) Load & buffer your landfill polygon ---
-landfill = (
-    gpd.read_file('landfill.geojson')
-       .to_crs(TARGET_CRS)
-)
+# (load_layer reprojects once and reuses the cached EPSG:2260 copy after that)
+landfill = load_layer('landfill.geojson')
 # 500 m ≈ 500 * 3.28084 = 1 640 ft
 buffer_geom = landfill.buffer(1640)
-buffer_area = buffer_geom.area.sum()
 
 # --- 2) Vector hazard layers (all reprojected) ---
 vector_layers = {
@@ -22,29 +20,15 @@ vector_layers = {
     'hydric_soils':      'hydric_soils.shp',
     'wellhead_areas':    'wellhead_protection.shp',
 }
-
-fractions = {}
-for name, path in vector_layers.items():
-    hazard = gpd.read_file(path).to_crs(TARGET_CRS)
-    inter = gpd.overlay(
-        gpd.GeoDataFrame(geometry=buffer_geom, crs=TARGET_CRS),
-        hazard, how='intersection'
-    )
-    area_in_zone = inter.geometry.area.sum()
-    fractions[name] = area_in_zone / buffer_area
+hazards = {name: load_layer(path) for name, path in vector_layers.items()}
 
 # --- 3) Raster hazard: depth‐to‐water < 1 m ---
-# assume 'depth_to_water.tif' is already in EPSG:2260; otherwise wrap it in a WarpedVRT.
-with rasterio.open('depth_to_water.tif') as src:
-    # mask with buffer footprint
-    out_image, out_transform = mask(src, buffer_geom.geometry, crop=True)
-    data = out_image[0]
-    valid = data != src.nodata
-    hazard = (data < 1.0) & valid
-    fractions['depth_to_water'] = hazard.sum() / valid.sum()
+# raster_path warps 'depth_to_water.tif' to EPSG:2260 once if it isn't already
+with rasterio.open(raster_path('depth_to_water.tif')) as src:
+    fractions = hydro_fractions(buffer_geom, hazards, depth_src=src)
 
 # --- 4) Composite score ---
-hydro_risk = np.mean(list(fractions.values()))
+hydro_risk = hydro_risk(fractions)
 
 # --- Output ---
 print("Layer fractions:")
@@ -0,0 +1,55 @@
+"""Shared fixtures: a throwaway job database and an in-process stub runner.
+
+    pytest tests
+"""
+import os
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+# before landfill_sdss.results is imported (its default root is read at import);
+# runner subprocesses inherit it too
+os.environ.setdefault('SDSS_RESULTS_DIR', tempfile.mkdtemp(prefix='sdss-results-'))
+os.environ.setdefault('SDSS_RUNNER_BACKEND', 'stub')
+
+from landfill_sdss import jobs                          # noqa: E402
+from landfill_sdss.runner import RunnerServer, StubBackend  # noqa: E402
+
+SCENARIO = {
+    'spatial_params': {'expansion_acreage': 30, 'height_increase_ft': 50, 'buffer_installed': True},
+    'nonspatial_params': {'fill_rate_tpd': 7500, 'turbine_efficiency_pct': 34.5, 'rng_upgrade': False},
+}
+
+
+@pytest.fixture
+def jq(tmp_path, monkeypatch):
+    """JobQueue on a temporary SDSS_JOBS_DB; job directories under tmp_path."""
+    db = tmp_path / 'jobs.sqlite'
+    monkeypatch.setenv('SDSS_JOBS_DB', str(db))
+    monkeypatch.setattr(jobs, 'JOBS_DIR', tmp_path / 'jobs')
+    return jobs.JobQueue(db)
+
+
+@contextmanager
+def serving(backend):
+    """Runner server for ``backend`` on a free loopback port, in a thread; yields the port."""
+    server = RunnerServer(backend, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield server.server_address[1]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def runner_port():
+    """Port of a warm stub runner for the duration of a test."""
+    with serving(StubBackend()) as port:
+        yield port
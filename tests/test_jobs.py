@@ -0,0 +1,54 @@
+"""Job queue: fair claiming, cancellation and stale-job recovery."""
+import time
+
+from conftest import SCENARIO
+from landfill_sdss import jobs
+
+
+def _make_stale(jq, job_id):
+    jq._update(job_id, heartbeat=time.time() - jobs.STALE_S - 1)
+
+
+def test_claim_prefers_owner_with_fewest_running_jobs(jq):
+    a1, a2, a3 = (jq.submit(SCENARIO, owner='a') for _ in range(3))
+    b1 = jq.submit(SCENARIO, owner='b')
+    order = [jq.claim('w')['id'] for _ in range(4)]
+    # a1 is oldest; then b has nothing running, so b1 jumps a2 and a3
+    assert order == [a1, b1, a2, a3]
+    assert jq.claim('w') is None
+    assert all(jq.get(j)['status'] == 'running' for j in order)
+
+
+def test_claim_is_oldest_first_within_an_owner(jq):
+    ids = [jq.submit(SCENARIO, owner='a') for _ in range(3)]
+    assert [jq.claim('w')['id'] for _ in ids] == ids
+
+
+def test_cancelled_jobs_are_not_claimed(jq):
+    job_id = jq.submit(SCENARIO)
+    assert jq.cancel(job_id)
+    assert jq.claim('w') is None
+    assert not jq.cancel(job_id)
+
+
+def test_requeue_stale_puts_lost_job_back(jq):
+    job_id = jq.submit(SCENARIO)
+    jq.claim('dead-worker')
+    assert jq.requeue_stale() == 0          # heartbeat still fresh
+    _make_stale(jq, job_id)
+    assert jq.requeue_stale() == 1
+    job = jq.get(job_id)
+    assert (job['status'], job['worker']) == ('queued', None)
+    assert jq.claim('w2')['attempts'] == 2
+
+
+def test_requeue_stale_fails_job_after_max_attempts(jq):
+    job_id = jq.submit(SCENARIO)
+    for attempt in range(1, 4):
+        assert jq.claim(f"w{attempt}")['attempts'] == attempt
+        _make_stale(jq, job_id)
+        jq.requeue_stale(max_attempts=3)
+    job = jq.get(job_id)
+    assert job['status'] == 'failed'
+    assert job['error'] == 'worker lost too many times'
+    assert jq.claim('w') is None
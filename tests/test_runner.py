@@ -0,0 +1,93 @@
+"""Runner socket protocol and the job worker's use of it (stub backend)."""
+import json
+import os
+import time
+
+from conftest import SCENARIO, serving
+from landfill_sdss import jobs
+from landfill_sdss.runner import StubBackend, _connect, submit
+
+
+def _submit(port, scenario, out):
+    events = []
+    ok = submit(scenario, out, events.append, port=port)
+    return ok, events
+
+
+def test_submit_runs_to_done(runner_port, tmp_path):
+    ok, events = _submit(runner_port, SCENARIO, tmp_path / 'out')
+    assert ok
+    assert events[-1]['done'] is True
+    assert [e['stage'] for e in events if 'stage' in e] == ['metrics', 'write outputs']
+    assert all(0 <= e['progress'] <= 1 for e in events if 'progress' in e)
+
+    (path,) = events[-1]['outputs']
+    metrics = json.loads(open(path).read())
+    assert metrics['backend'] == 'stub'
+    assert metrics['added_capacity_tons'] > 0
+    assert metrics['compliant'] is None   # no verdict from placeholder constants
+
+
+def test_backend_error_ends_with_error_event(tmp_path):
+    class Broken(StubBackend):
+        def run(self, scenario, out_dir, emit):
+            emit({'progress': 0.1})
+            raise RuntimeError('model blew up')
+
+    with serving(Broken()) as port:
+        ok, events = _submit(port, SCENARIO, tmp_path)
+    assert not ok
+    assert events[0] == {'progress': 0.1}
+    assert events[-1]['error'] == 'RuntimeError: model blew up'
+    assert 'Traceback' in events[-1]['traceback']
+
+
+def test_bad_request_then_ping_and_run(runner_port, tmp_path):
+    with _connect(runner_port) as sock:
+        sock.sendall(b'not json\n')
+        assert 'bad request' in json.loads(sock.makefile('r').readline())['error']
+    with _connect(runner_port) as sock:
+        sock.sendall(b'{"ping": true}\n')
+        assert json.loads(sock.makefile('r').readline()) == {'pong': True, 'backend': 'stub'}
+    assert _submit(runner_port, SCENARIO, tmp_path)[0]
+
+
+def test_run_job_done_through_stub_runner(jq, runner_port):
+    job_id = jq.submit(SCENARIO)
+    assert jobs.run_job(jq, jq.claim('w'), runner_port) == 'done'
+    job = jq.get(job_id)
+    assert job['status'] == 'done' and job['progress'] == 1.0
+    assert any(p.endswith('metrics.json') for p in job['outputs'])
+    assert {'metrics', 'write outputs', 'scenario run'} <= {s['stage'] for s in job['stages']}
+
+
+def test_run_job_timeout_kills_client_and_restarts_runner(jq, tmp_path, monkeypatch):
+    # a model runner that reports once and then hangs
+    hang = tmp_path / 'hang.py'
+    hang.write_text(
+        "import json, os, sys, time\n"
+        "open(sys.argv[1] + '.pid', 'w').write(str(os.getpid()))\n"
+        "print(json.dumps({'progress': 0.1, 'message': 'stuck'}), flush=True)\n"
+        "time.sleep(60)\n")
+    restarted = []
+    monkeypatch.setattr(jobs, 'RUNNER', str(hang))
+    monkeypatch.setattr(jobs, 'TIMEOUT_S', 1.0)
+    monkeypatch.setattr(jobs, 'POLL_S', 0.1)
+    monkeypatch.setattr(jobs, 'restart_server', restarted.append)
+
+    job_id = jq.submit(SCENARIO)
+    start = time.time()
+    assert jobs.run_job(jq, jq.claim('w'), runner_port=9123) == 'failed'
+    assert time.time() - start < 10
+
+    job = jq.get(job_id)
+    assert job['status'] == 'failed'
+    assert job['error'] == f"timed out after {jobs.TIMEOUT_S} s"
+    assert restarted == [9123]
+    pid = int((jobs.job_dir(job_id) / 'scenario.json.pid').read_text())
+    try:
+        os.kill(pid, 0)
+        alive = True
+    except ProcessLookupError:
+        alive = False
+    assert not alive, "client process still running after the timeout"